@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Bounded-Memory Affiliation Counts
+=================================
+
+A Space-Saving heavy-hitters sketch (Metwally, Agrawal & El Abbadi, 2005) used
+as a fixed-memory alternative to the exact Counter of notable affiliations.
+
+Error bounds, for a sketch of capacity k that has absorbed a total weight N:
+
+* every tracked item's estimate satisfies true <= estimate <= true + error,
+  with error <= N / k;
+* any item whose true count exceeds N / k is guaranteed to be tracked;
+* untracked items have true count <= min_count() <= N / k.
+
+Sketches built on parallel workers or daily partitions combine with merge(),
+which keeps the same N / k bound over the combined stream (Agarwal et al.,
+"Mergeable Summaries", 2012).
+"""
+
+import heapq
+from itertools import count as _sequence
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+class SpaceSaving:
+    """Space-Saving top-k sketch with a Counter-like read interface."""
+
+    def __init__(self, capacity: int = 256):
+        if capacity < 1:
+            raise ValueError("Sketch capacity must be at least 1")
+        self.capacity = capacity
+        self.total = 0
+        self.counts: Dict[Hashable, int] = {}
+        self.errors: Dict[Hashable, int] = {}
+        # Min-heap of (count, seq, item); stale entries are skipped lazily
+        self._heap: List[Tuple[int, int, Hashable]] = []
+        self._seq = _sequence()
+
+    def _push(self, item: Hashable):
+        heapq.heappush(self._heap, (self.counts[item], next(self._seq), item))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(c, next(self._seq), i) for i, c in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self) -> Tuple[Hashable, int]:
+        """Remove and return the tracked item with the smallest count."""
+        while True:
+            count, _, item = heapq.heappop(self._heap)
+            if self.counts.get(item) == count:
+                return item, count
+
+    def update(self, item: Hashable, weight: int = 1):
+        """Add weight occurrences of item."""
+        self.total += weight
+        if item in self.counts:
+            self.counts[item] += weight
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = weight
+            self.errors[item] = 0
+        else:
+            evicted, min_count = self._pop_min()
+            del self.counts[evicted], self.errors[evicted]
+            self.counts[item] = min_count + weight
+            self.errors[item] = min_count
+        self._push(item)
+
+    def update_many(self, items: Iterable[Hashable]):
+        """Add one occurrence of each item."""
+        for item in items:
+            self.update(item)
+
+    def min_count(self) -> int:
+        """Upper bound on the true count of any untracked item."""
+        if len(self.counts) < self.capacity:
+            return 0
+        return min(self.counts.values())
+
+    def merge(self, other: 'SpaceSaving') -> 'SpaceSaving':
+        """Fold another sketch into this one, keeping this sketch's capacity."""
+        self_floor, other_floor = self.min_count(), other.min_count()
+        counts, errors = {}, {}
+
+        for item in set(self.counts) | set(other.counts):
+            counts[item] = self.counts.get(item, self_floor) + other.counts.get(item, other_floor)
+            errors[item] = self.errors.get(item, self_floor) + other.errors.get(item, other_floor)
+
+        # Preserve first-seen order among equal counts: this sketch's items first
+        order = {item: i for i, item in enumerate(list(self.counts) + list(other.counts))}
+        kept = sorted(counts, key=lambda item: (-counts[item], order[item]))[:self.capacity]
+
+        self.counts = {item: counts[item] for item in kept}
+        self.errors = {item: errors[item] for item in kept}
+        self.total += other.total
+        self._heap = [(c, next(self._seq), i) for i, c in self.counts.items()]
+        heapq.heapify(self._heap)
+        return self
+
+    def error_bound(self) -> float:
+        """Worst-case overestimate of any tracked count (N / capacity)."""
+        return self.total / self.capacity
+
+    def most_common(self, n: Optional[int] = None) -> List[Tuple[Hashable, int]]:
+        """Tracked items by estimated count, like Counter.most_common."""
+        ranked = sorted(self.counts.items(), key=lambda pair: -pair[1])
+        return ranked if n is None else ranked[:n]
+
+    def guaranteed(self, n: Optional[int] = None) -> List[Tuple[Hashable, int]]:
+        """Top items whose rank is certain despite estimation error."""
+        ranked = self.most_common()
+        result = []
+        for i, (item, estimate) in enumerate(ranked[:n] if n is not None else ranked):
+            next_estimate = ranked[i + 1][1] if i + 1 < len(ranked) else self.min_count()
+            if estimate - self.errors[item] < next_estimate:
+                break
+            result.append((item, estimate))
+        return result
+
+    def __getitem__(self, item: Hashable) -> int:
+        return self.counts.get(item, 0)
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self.counts
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def items(self):
+        return self.counts.items()
+
+    def __repr__(self) -> str:
+        return f"SpaceSaving(capacity={self.capacity}, total={self.total}, tracked={len(self.counts)})"
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+SparkLab Alumni-Organization Graph
+==================================
+
+The current and past affiliation columns define a bipartite graph of alumni
+and organizations. Both edge sets are held as SciPy CSR incidence matrices
+(alumni x organizations), and every analysis is sparse linear algebra over
+them: organization co-occurrence is B.T @ B, talent-pipeline flows are
+Past.T @ Current, alumni clusters are connected components of the bipartite
+graph, and eigenvector centrality is a power iteration on the co-occurrence
+matrix. Only the incidence matrices are cached next to the roster, keyed by
+its fingerprint; everything else is derived from them on demand.
+"""
+
+import json
+import os
+import zipfile
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+from sparklab_analysis import roster_cache_path, roster_fingerprint
+from data_validation import PLACEHOLDERS
+
+GRAPH_VERSION = 1
+CURRENT_COLUMN = 'Company/University 1'
+PAST_COLUMN = 'Company/University 2'
+EXCLUDED_ORGS = PLACEHOLDERS + ['Unknown']
+
+def organization_key(name: str) -> str:
+    """Case- and whitespace-insensitive key under which org names are merged."""
+    return ' '.join(name.split()).casefold()
+
+def _incidence(codes: np.ndarray, n_alumni: int, n_orgs: int) -> sparse.csr_matrix:
+    """Binary alumni x organization matrix from one org code per alumnus (-1 = none)."""
+    alumni = np.flatnonzero(codes >= 0)
+    matrix = sparse.csr_matrix((np.ones(len(alumni), dtype=np.int32), (alumni, codes[alumni])),
+                               shape=(n_alumni, n_orgs))
+    matrix.sum_duplicates()
+    matrix.data[:] = 1
+    return matrix
+
+class AlumniGraph:
+    """Bipartite alumni-organization graph backed by sparse incidence matrices."""
+
+    def __init__(self, current: sparse.csr_matrix, past: sparse.csr_matrix, organizations: List[str],
+                 fingerprint: Optional[str] = None):
+        self.current = current.tocsr()
+        self.past = past.tocsr()
+        self.organizations = list(organizations)
+        self.fingerprint = fingerprint
+
+        incidence = self.current + self.past
+        incidence.data[:] = 1
+        self.incidence = incidence
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, fingerprint: Optional[str] = None) -> 'AlumniGraph':
+        """Build the graph from the wide roster's current and past affiliation columns."""
+        n_alumni = len(df)
+        columns = [df[col] if col in df.columns else pd.Series(np.nan, index=df.index)
+                   for col in (CURRENT_COLUMN, PAST_COLUMN)]
+
+        # Normalize each distinct raw name once, then merge names sharing a key
+        raw_codes, raw_names = pd.factorize(pd.concat(columns, ignore_index=True))
+        keys = pd.Series([organization_key(str(name)) for name in raw_names], dtype=object)
+        excluded = pd.Series(raw_names, dtype=object).isin(EXCLUDED_ORGS).to_numpy() | (keys == '').to_numpy()
+        key_codes, _ = pd.factorize(keys.where(~excluded))
+
+        # Label each organization by the first raw spelling seen
+        first_raw = pd.Series(np.arange(len(raw_names))).groupby(key_codes).first()
+        first_raw = first_raw[first_raw.index >= 0]
+        organizations = [str(raw_names[i]).strip() for i in first_raw.to_numpy()]
+
+        codes = np.where(raw_codes >= 0, key_codes[raw_codes] if len(key_codes) else -1, -1)
+        current = _incidence(codes[:n_alumni], n_alumni, len(organizations))
+        past = _incidence(codes[n_alumni:], n_alumni, len(organizations))
+        return cls(current, past, organizations, fingerprint)
+
+    @property
+    def shape(self):
+        return self.incidence.shape
+
+    def co_occurrence(self) -> sparse.csr_matrix:
+        """Organization x organization alumni counts; the diagonal is each org's alumni total."""
+        return (self.incidence.T @ self.incidence).tocsr()
+
+    def top_co_occurrences(self, n: int = 20) -> pd.DataFrame:
+        """Organization pairs sharing the most alumni."""
+        pairs = sparse.triu(self.co_occurrence(), k=1).tocoo()
+        order = np.lexsort((pairs.col, pairs.row, -pairs.data))[:n]
+        return pd.DataFrame({
+            'organization_a': [self.organizations[i] for i in pairs.row[order]],
+            'organization_b': [self.organizations[i] for i in pairs.col[order]],
+            'shared_alumni': pairs.data[order]
+        })
+
+    def alumni_clusters(self) -> np.ndarray:
+        """Cluster label per alumnus: connected components of the bipartite graph."""
+        n_alumni, n_orgs = self.shape
+        adjacency = sparse.bmat([[None, self.incidence], [self.incidence.T, None]], format='csr',
+                                dtype=np.int32) if n_alumni and n_orgs else sparse.csr_matrix((n_alumni, n_alumni))
+        _, labels = connected_components(adjacency, directed=False)
+        return labels[:n_alumni]
+
+    def cluster_sizes(self) -> pd.Series:
+        """Alumni per cluster, largest first, ignoring alumni with no organization."""
+        labels = self.alumni_clusters()
+        linked = np.diff(self.incidence.indptr) > 0
+        return pd.Series(labels[linked]).value_counts()
+
+    def eigenvector_centrality(self, max_iter: int = 100, tol: float = 1e-9) -> np.ndarray:
+        """Eigenvector centrality of organizations in the co-occurrence graph (power iteration)."""
+        adjacency = self.co_occurrence()
+        adjacency.setdiag(0)
+        adjacency.eliminate_zeros()
+        n_orgs = adjacency.shape[0]
+        if n_orgs == 0:
+            return np.zeros(0)
+
+        # Iterate on A + I so bipartite-like components cannot oscillate
+        x = np.full(n_orgs, 1.0 / np.sqrt(n_orgs))
+        for _ in range(max_iter):
+            nxt = adjacency @ x + x
+            norm = np.linalg.norm(nxt)
+            if norm == 0:
+                return nxt
+            nxt /= norm
+            if np.abs(nxt - x).sum() < n_orgs * tol:
+                return nxt
+            x = nxt
+        return x
+
+    def organization_centrality(self) -> pd.DataFrame:
+        """Alumni count, co-occurrence degree and eigenvector centrality per organization."""
+        co_occurrence = self.co_occurrence()
+        alumni = co_occurrence.diagonal()
+        weighted = np.asarray(co_occurrence.sum(axis=1)).ravel() - alumni
+        neighbors = np.diff(co_occurrence.indptr) - (alumni > 0)
+
+        frame = pd.DataFrame({
+            'organization': self.organizations,
+            'alumni': alumni,
+            'current_alumni': np.asarray(self.current.sum(axis=0)).ravel(),
+            'degree': neighbors,
+            'weighted_degree': weighted,
+            'eigenvector': self.eigenvector_centrality()
+        })
+        return frame.sort_values(['eigenvector', 'alumni'], ascending=False, kind='stable').reset_index(drop=True)
+
+    def pipeline_flows(self) -> sparse.csr_matrix:
+        """Past x current organization matrix: alumni who moved from row org to column org."""
+        return (self.past.T @ self.current).tocsr()
+
+    def top_pipelines(self, n: int = 20, include_stayers: bool = False) -> pd.DataFrame:
+        """Largest past -> current organization flows."""
+        flows = self.pipeline_flows().tocoo()
+        keep = include_stayers | (flows.row != flows.col)
+        rows, cols, data = flows.row[keep], flows.col[keep], flows.data[keep]
+        order = np.lexsort((cols, rows, -data))[:n]
+        return pd.DataFrame({
+            'from_organization': [self.organizations[i] for i in rows[order]],
+            'to_organization': [self.organizations[i] for i in cols[order]],
+            'alumni': data[order]
+        })
+
+    def save(self, filepath: str):
+        """Write the incidence matrices as a compressed .npz archive."""
+        meta = {'version': GRAPH_VERSION, 'shape': list(self.shape),
+                'fingerprint': self.fingerprint, 'organizations': self.organizations}
+        arrays = {}
+        for name, matrix in (('current', self.current), ('past', self.past)):
+            arrays[f"{name}_indices"] = matrix.indices
+            arrays[f"{name}_indptr"] = matrix.indptr
+        with open(filepath, 'wb') as f:
+            np.savez_compressed(f, __meta__=np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8),
+                                **arrays)
+
+    @classmethod
+    def load(cls, filepath: str) -> 'AlumniGraph':
+        """Read a graph written by save()."""
+        with np.load(filepath) as archive:
+            meta = json.loads(archive['__meta__'].tobytes().decode('utf-8'))
+            if meta['version'] != GRAPH_VERSION:
+                raise ValueError(f"Unsupported graph version: {meta['version']}")
+            matrices = {}
+            for name in ('current', 'past'):
+                indices = archive[f"{name}_indices"]
+                matrices[name] = sparse.csr_matrix(
+                    (np.ones(len(indices), dtype=np.int32), indices, archive[f"{name}_indptr"]),
+                    shape=tuple(meta['shape']))
+        return cls(matrices['current'], matrices['past'], meta['organizations'], meta['fingerprint'])
+
+def load_or_build_graph(roster_filepath: str, df: Optional[pd.DataFrame] = None) -> AlumniGraph:
+    """Load the graph cached next to the roster, rebuilding it if the roster changed."""
+    graph_path = roster_cache_path(roster_filepath, 'graph.npz')
+    fingerprint = roster_fingerprint(roster_filepath)
+
+    graph = None
+    if os.path.exists(graph_path):
+        try:
+            graph = AlumniGraph.load(graph_path)
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+            pass  # Older format or a damaged file: rebuilt and overwritten below
+    if graph is not None and graph.fingerprint == fingerprint:
+        return graph
+
+    if df is None:
+        from sparklab_analysis import load_and_clean_data
+        df = load_and_clean_data(roster_filepath)
+
+    graph = AlumniGraph.build(df, fingerprint)
+    graph.save(graph_path)
+    return graph
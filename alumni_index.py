@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+SparkLab Alumni Bitset Index
+============================
+
+An inverted index with one bitset per value of Sector, Type, Year, leadership
+role and canonical affiliation. Drill-down questions such as "faculty at MIT
+who graduated after 2015" become AND/OR/NOT over packed 64-bit words instead of
+rebuilding boolean masks over the full DataFrame for every query. The index is
+saved compressed next to the cached roster and reloaded when the roster's
+fingerprint still matches.
+"""
+
+import hashlib
+import json
+import os
+import zipfile
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from sparklab_analysis import (INDUSTRY_MAPPING, NOTABLE_ORGANIZATIONS, RULES_VERSION,
+                               match_notable_organization, roster_fingerprint, roster_cache_path)
+
+INDEX_VERSION = 1
+
+def rules_key() -> str:
+    """Key for the rules the Role and affiliation bitsets were derived with."""
+    organizations = hashlib.sha1(json.dumps(NOTABLE_ORGANIZATIONS).encode('utf-8')).hexdigest()[:12]
+    return f"{RULES_VERSION}/{organizations}"
+
+if hasattr(np, 'bitwise_count'):
+    def _popcount(words: np.ndarray) -> int:
+        return int(np.bitwise_count(words).sum())
+else:
+    _POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+    def _popcount(words: np.ndarray) -> int:
+        return int(_POPCOUNT_TABLE[words.view(np.uint8)].sum(dtype=np.int64))
+
+def _match_notable(companies: pd.Series) -> pd.Series:
+    """Canonical notable organization per row, matching each distinct name once."""
+    codes, uniques = pd.factorize(companies)
+    matched = np.array([match_notable_organization(company) for company in uniques] + [None], dtype=object)
+    return pd.Series(matched[codes], index=companies.index)
+
+class Bitset:
+    """Fixed-length bitset over roster rows, packed into uint64 words."""
+
+    __slots__ = ('words', 'size')
+
+    def __init__(self, words: np.ndarray, size: int):
+        self.words = words
+        self.size = size
+
+    @classmethod
+    def empty(cls, size: int) -> 'Bitset':
+        return cls(np.zeros((size + 63) // 64, dtype=np.uint64), size)
+
+    @classmethod
+    def full(cls, size: int) -> 'Bitset':
+        return ~cls.empty(size)
+
+    @classmethod
+    def from_rows(cls, rows: np.ndarray, size: int) -> 'Bitset':
+        bits = cls.empty(size)
+        rows = np.asarray(rows, dtype=np.int64)
+        np.bitwise_or.at(bits.words, rows >> 6, np.left_shift(np.uint64(1), (rows & 63).astype(np.uint64)))
+        return bits
+
+    def _check(self, other: 'Bitset'):
+        if self.size != other.size:
+            raise ValueError("Bitsets cover different numbers of rows")
+
+    def __and__(self, other: 'Bitset') -> 'Bitset':
+        self._check(other)
+        return Bitset(self.words & other.words, self.size)
+
+    def __or__(self, other: 'Bitset') -> 'Bitset':
+        self._check(other)
+        return Bitset(self.words | other.words, self.size)
+
+    def __xor__(self, other: 'Bitset') -> 'Bitset':
+        self._check(other)
+        return Bitset(self.words ^ other.words, self.size)
+
+    def __sub__(self, other: 'Bitset') -> 'Bitset':
+        self._check(other)
+        return Bitset(self.words & ~other.words, self.size)
+
+    def __invert__(self) -> 'Bitset':
+        words = ~self.words
+        tail = self.size % 64
+        if tail and len(words):
+            words[-1] &= np.uint64((1 << tail) - 1)
+        return Bitset(words, self.size)
+
+    def count(self) -> int:
+        """Number of rows in the set."""
+        return _popcount(self.words)
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def rows(self) -> np.ndarray:
+        """Row positions in the set, ascending."""
+        bits = np.unpackbits(self.words.view(np.uint8), bitorder='little')[:self.size]
+        return np.flatnonzero(bits)
+
+class AlumniIndex:
+    """Bitset per (field, value) over the rows of a categorized roster."""
+
+    def __init__(self, bitsets: Dict[str, Dict[str, Bitset]], size: int, fingerprint: Optional[str] = None,
+                 rules: Optional[str] = None):
+        self.bitsets = bitsets
+        self.size = size
+        self.fingerprint = fingerprint
+        self.rules = rules if rules is not None else rules_key()
+
+    @staticmethod
+    def _field_values(df: pd.DataFrame) -> Dict[str, pd.Series]:
+        """Single-valued fields to index, as string Series aligned to the rows."""
+        sector = df['Sector'] if 'Sector' in df.columns else \
+            df['Industry or Academia?'].map(INDUSTRY_MAPPING).fillna('Unknown')
+        year = pd.to_numeric(df['Year'], errors='coerce')
+        year = year.where(year == np.floor(year))  # Fractional years count as Unknown
+
+        fields = {
+            'Sector': sector.astype(str),
+            'Type': df['Type'].fillna('Unknown').astype(str),
+            'Year': year.astype('Int64').astype(str).replace('<NA>', 'Unknown'),
+            'Current Affiliation': _match_notable(df['Company/University 1']),
+        }
+        if 'Company/University 2' in df.columns:
+            fields['Past Affiliation'] = _match_notable(df['Company/University 2'])
+        return fields
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, fingerprint: Optional[str] = None) -> 'AlumniIndex':
+        """Build the index from a frame that has been through categorize_positions."""
+        size = len(df)
+        bitsets = {}
+
+        for field, values in cls._field_values(df).items():
+            codes, uniques = pd.factorize(values)
+            bitsets[field] = cls._group_bitsets(codes, uniques, size)
+
+        # Leadership roles are multi-valued: explode to (row, role) pairs
+        roles = pd.Series(list(df['Leadership_Roles']), index=np.arange(size)).explode()
+        codes, uniques = pd.factorize(roles.values)
+        bitsets['Role'] = cls._group_bitsets(codes, uniques, size, rows=roles.index.to_numpy())
+
+        # Affiliation is the union of current and past
+        affiliation = dict(bitsets['Current Affiliation'])
+        for org, bits in bitsets.get('Past Affiliation', {}).items():
+            affiliation[org] = affiliation[org] | bits if org in affiliation else bits
+        bitsets['Affiliation'] = affiliation
+
+        return cls(bitsets, size, fingerprint)
+
+    @staticmethod
+    def _group_bitsets(codes: np.ndarray, uniques, size: int,
+                       rows: Optional[np.ndarray] = None) -> Dict[str, Bitset]:
+        """One bitset per factorized value, in a single sorted pass."""
+        rows = np.arange(len(codes)) if rows is None else np.asarray(rows, dtype=np.int64)
+        valid = codes >= 0
+        codes, rows = codes[valid], rows[valid]
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+
+        return {str(value): Bitset.from_rows(rows[order[bounds[i]:bounds[i + 1]]], size)
+                for i, value in enumerate(uniques)}
+
+    def fields(self) -> List[str]:
+        return list(self.bitsets)
+
+    def values(self, field: str) -> List[str]:
+        return list(self.bitsets[field])
+
+    def all(self) -> Bitset:
+        return Bitset.full(self.size)
+
+    def get(self, field: str, value) -> Bitset:
+        """Bitset for field == value; empty if the value never occurs."""
+        if field not in self.bitsets:
+            raise KeyError(f"Field is not indexed: {field}")
+        bits = self.bitsets[field].get(str(value))
+        return bits if bits is not None else Bitset.empty(self.size)
+
+    def any_of(self, field: str, values: Iterable) -> Bitset:
+        """Bitset for field in values."""
+        result = Bitset.empty(self.size)
+        for value in values:
+            bits = self.bitsets[field].get(str(value))
+            if bits is not None:
+                result.words |= bits.words
+        return result
+
+    def year_range(self, start: Optional[int] = None, end: Optional[int] = None) -> Bitset:
+        """Bitset for start <= Year <= end; either bound may be open."""
+        years = [year for year in self.bitsets['Year'] if year != 'Unknown'
+                 and (start is None or int(year) >= start) and (end is None or int(year) <= end)]
+        return self.any_of('Year', years)
+
+    def counts(self, field: str, within: Optional[Bitset] = None) -> Dict[str, int]:
+        """Count of rows per value of field, optionally restricted to a bitset."""
+        return {value: (bits & within).count() if within is not None else bits.count()
+                for value, bits in self.bitsets[field].items()}
+
+    def select(self, df: pd.DataFrame, bits: Bitset) -> pd.DataFrame:
+        """Rows of df (the frame the index was built from) in the bitset."""
+        if len(df) != self.size:
+            raise ValueError("DataFrame does not match the indexed roster")
+        return df.iloc[bits.rows()]
+
+    def save(self, filepath: str):
+        """Write the index as a compressed .npz archive."""
+        layout = {field: list(values) for field, values in self.bitsets.items()}
+        words = [bits.words for values in self.bitsets.values() for bits in values.values()]
+        arrays = {f"bits_{i}": array for i, array in enumerate(words)}
+        meta = {'version': INDEX_VERSION, 'size': self.size,
+                'fingerprint': self.fingerprint, 'rules': self.rules, 'layout': layout}
+        with open(filepath, 'wb') as f:
+            np.savez_compressed(f, __meta__=np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8),
+                                **arrays)
+
+    @classmethod
+    def load(cls, filepath: str) -> 'AlumniIndex':
+        """Read an index written by save()."""
+        with np.load(filepath) as archive:
+            meta = json.loads(archive['__meta__'].tobytes().decode('utf-8'))
+            if meta['version'] != INDEX_VERSION:
+                raise ValueError(f"Unsupported index version: {meta['version']}")
+            bitsets = {}
+            position = 0
+            for field, values in meta['layout'].items():
+                bitsets[field] = {}
+                for value in values:
+                    bitsets[field][value] = Bitset(archive[f"bits_{position}"], meta['size'])
+                    position += 1
+        # Indexes written before rules were recorded never match the current rules
+        return cls(bitsets, meta['size'], meta['fingerprint'], meta.get('rules', ''))
+
+def load_or_build_index(roster_filepath: str, df: Optional[pd.DataFrame] = None) -> AlumniIndex:
+    """Load the index cached next to the roster, rebuilding it if the roster or rules changed."""
+    index_path = roster_cache_path(roster_filepath, 'index.npz')
+    fingerprint = roster_fingerprint(roster_filepath)
+
+    index = None
+    if os.path.exists(index_path):
+        try:
+            index = AlumniIndex.load(index_path)
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+            pass  # Older format or a damaged file: rebuilt and overwritten below
+    if index is not None and index.fingerprint == fingerprint and index.rules == rules_key():
+        return index
+
+    if df is None:
+        from sparklab_analysis import load_and_clean_data, categorize_positions
+        df = categorize_positions(load_and_clean_data(roster_filepath))
+
+    index = AlumniIndex.build(df, fingerprint)
+    index.save(index_path)
+    return index
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+SparkLab Arrow Compute Backend
+==============================
+
+An optional execution path for the metrics pipeline built on Apache Arrow.
+Sector mapping and affiliation matching run as pyarrow.compute string kernels
+over dictionary-encoded columns, and titles are classified with the shared
+rule matcher once per distinct value, so every distinct title or organization
+is scanned once. Counts and group-bys use Arrow's hash kernels. The result is
+the same metrics dict that calculate_impact_metrics returns.
+
+Parquet and Arrow IPC/Feather inputs are memory-mapped without copying. CSV
+rosters go through the pandas parser first, because Arrow's CSV reader rejects
+rows with fewer fields than the header.
+"""
+
+import os
+from collections import Counter
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from classification_rules import POSITION_SEPARATOR
+from sparklab_analysis import (INDUSTRY_MAPPING, LEADERSHIP_ROLES, NOTABLE_ORGANIZATIONS, ROLE_MASK_DTYPE,
+                               RULE_MATCHER)
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = pc = pq = None
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("The Arrow backend requires pyarrow: pip install pyarrow")
+
+def load_arrow_table(filepath: str) -> 'pa.Table':
+    """Load a roster as an Arrow table from CSV, Arrow IPC/Feather or Parquet."""
+    _require_pyarrow()
+    extension = os.path.splitext(filepath)[1].lower()
+
+    if extension == '.parquet' or os.path.isdir(filepath):
+        table = pq.read_table(filepath, memory_map=True)
+    elif extension in ('.arrow', '.feather', '.ipc'):
+        with pa.memory_map(filepath) as source:
+            try:
+                table = pa.ipc.open_file(source).read_all()
+            except pa.ArrowInvalid:
+                source.seek(0)
+                table = pa.ipc.open_stream(source).read_all()
+    else:
+        table = pa.Table.from_pandas(pd.read_csv(filepath, dtype=str), preserve_index=False)
+
+    return clean_arrow_table(table)
+
+def clean_arrow_table(table: 'pa.Table') -> 'pa.Table':
+    """Arrow equivalent of clean_data: strip names, drop empty rows, fill key columns."""
+    table = table.rename_columns([name.strip() for name in table.column_names])
+
+    # Remove rows with all null values
+    all_null = None
+    for column in table.columns:
+        null = pc.is_null(column)
+        all_null = null if all_null is None else pc.and_(all_null, null)
+    if all_null is not None:
+        table = table.filter(pc.invert(all_null))
+
+    # Fill missing values in key columns
+    for name in ['Industry or Academia?', 'Position 1', 'Company/University 1']:
+        index = table.column_names.index(name)
+        column = pc.cast(table.column(name), pa.string())
+        table = table.set_column(index, name, pc.fill_null(column, 'Unknown'))
+
+    return table
+
+def _string_column(table: 'pa.Table', name: str) -> 'pa.ChunkedArray':
+    """A column as strings, or all-null if the roster lacks it."""
+    if name not in table.column_names:
+        return pa.chunked_array([pa.nulls(table.num_rows, pa.string())])
+    return pc.cast(table.column(name), pa.string())
+
+def _dictionary(column) -> 'pa.DictionaryArray':
+    """Dictionary-encode a (chunked) string column into one array."""
+    return pc.dictionary_encode(column.combine_chunks() if isinstance(column, pa.ChunkedArray) else column)
+
+def _value_counts_series(column, name: str) -> pd.Series:
+    """value_counts-style Series: count descending, first appearance breaks ties."""
+    counts = pc.value_counts(column)
+    values = counts.field('values').to_pylist()
+    frequencies = counts.field('counts').to_numpy()
+    series = pd.Series(frequencies, index=pd.Index(values, name=name), name='count', dtype='int64')
+    series = series[series.index.notna()]
+    return series.sort_values(ascending=False, kind='stable')
+
+def _normalized_titles(column) -> 'pa.Array':
+    """Upper-case titles with whitespace collapsed, matching the classification cache keys."""
+    text = pc.utf8_upper(pc.replace_substring_regex(column, r'\s+', ' '))
+    return pc.utf8_trim_whitespace(text)
+
+def classify_role_masks(table: 'pa.Table') -> np.ndarray:
+    """Leadership role bitmask per row (bit i is LEADERSHIP_ROLES[i])."""
+    position1 = _normalized_titles(_string_column(table, 'Position 1'))
+    raw_position2 = pc.fill_null(_string_column(table, 'Position 2 or Past Position'), 'nan')
+    position2 = pc.if_else(pc.equal(raw_position2, 'nan'), '', _normalized_titles(raw_position2))
+
+    with_second = pc.binary_join_element_wise(position1, position2, POSITION_SEPARATOR)
+    combined = pc.if_else(pc.equal(position2, ''), position1, with_second)
+
+    # Match each distinct title once with the shared ruleset, then broadcast
+    # through the dictionary indices
+    encoded = _dictionary(combined)
+    title_masks = np.array([RULE_MATCHER.mask_text(title) for title in encoded.dictionary.to_pylist()],
+                           dtype=ROLE_MASK_DTYPE)
+
+    return title_masks[encoded.indices.to_numpy(zero_copy_only=False)]
+
+def _role_counter(masks: np.ndarray) -> Counter:
+    """Counter of roles in the first-appearance order of the pandas path."""
+    columns = [(masks & ROLE_MASK_DTYPE.type(1 << bit)) != 0 for bit in range(len(LEADERSHIP_ROLES))]
+    columns.append(masks == 0)
+    roles = LEADERSHIP_ROLES + ['Other']
+
+    counts = {}
+    first_seen = []
+    for order, (role, present) in enumerate(zip(roles, columns)):
+        if present.any():
+            counts[role] = int(present.sum())
+            first_seen.append((int(np.argmax(present)), order, role))
+    return Counter({role: counts[role] for _, _, role in sorted(first_seen)})
+
+def match_affiliation_ids(column) -> Tuple[np.ndarray, List[str]]:
+    """Index into NOTABLE_ORGANIZATIONS of the first notable name per row, or -1."""
+    encoded = _dictionary(column)
+    names = encoded.dictionary
+    name_ids = np.full(len(names), -1, dtype=np.int32)
+    for org_id, notable in enumerate(NOTABLE_ORGANIZATIONS):
+        hit = pc.fill_null(pc.match_substring(names, notable, ignore_case=True), False)
+        name_ids[(name_ids < 0) & hit.to_numpy(zero_copy_only=False)] = org_id
+
+    indices = encoded.indices
+    ids = name_ids[pc.fill_null(indices, 0).to_numpy(zero_copy_only=False)]
+    ids[pc.is_null(indices).to_numpy(zero_copy_only=False)] = -1
+    return ids, NOTABLE_ORGANIZATIONS
+
+def identify_notable_companies_arrow(table: 'pa.Table') -> Counter:
+    """Arrow equivalent of identify_notable_companies."""
+    current_ids, labels = match_affiliation_ids(_string_column(table, 'Company/University 1'))
+    past_ids, _ = match_affiliation_ids(_string_column(table, 'Company/University 2'))
+    ids = np.concatenate([current_ids, past_ids])
+    ids = ids[ids >= 0]
+
+    counts = np.bincount(ids, minlength=len(labels))
+    return Counter({labels[org_id]: int(counts[org_id]) for org_id in pd.unique(ids)})
+
+def sector_column(table: 'pa.Table') -> 'pa.Array':
+    """Map raw sector strings through INDUSTRY_MAPPING via the dictionary."""
+    encoded = _dictionary(_string_column(table, 'Industry or Academia?'))
+    mapped = pa.array([INDUSTRY_MAPPING.get(value, 'Unknown') for value in encoded.dictionary.to_pylist()],
+                      type=pa.string())
+    return pc.fill_null(pc.take(mapped, encoded.indices), 'Unknown')
+
+def sector_by_type(table: 'pa.Table') -> pd.DataFrame:
+    """Type x Sector counts via an Arrow hash group-by (the crosstab in the dashboard)."""
+    grouped = pa.table({'Type': _string_column(table, 'Type'), 'Sector': sector_column(table)}) \
+        .group_by(['Type', 'Sector']).aggregate([([], 'count_all')]).to_pandas()
+    grouped = grouped.dropna(subset=['Type'])
+    return grouped.pivot(index='Type', columns='Sector', values='count_all').fillna(0).astype('int64')
+
+def calculate_impact_metrics_arrow(table: 'pa.Table') -> Dict:
+    """Arrow equivalent of categorize_positions followed by calculate_impact_metrics."""
+    _require_pyarrow()
+    total_alumni = table.num_rows
+
+    sector_dist = _value_counts_series(sector_column(table), 'Sector')
+    masks = classify_role_masks(table)
+    role_bits = {role: ROLE_MASK_DTYPE.type(1 << bit) for bit, role in enumerate(LEADERSHIP_ROLES)}
+
+    return {
+        'total_alumni': total_alumni,
+        'sector_distribution': {
+            'distribution': sector_dist,
+            'percentages': (sector_dist / total_alumni * 100).round(1)
+        },
+        'leadership_positions': {
+            'all_roles': _role_counter(masks),
+            'ceo_founders': int(np.count_nonzero(masks & role_bits['CEO/Founder'])),
+            'ctos': int(np.count_nonzero(masks & role_bits['CTO'])),
+            'faculty': int(np.count_nonzero(masks & role_bits['Faculty'])),
+            'senior_leadership': int(np.count_nonzero(masks & role_bits['Senior Leadership']))
+        },
+        'notable_affiliations': identify_notable_companies_arrow(table),
+        'alumni_types': _value_counts_series(_string_column(table, 'Type'), 'Type')
+    }
+
+def analyze_arrow(filepath: str) -> Dict:
+    """Load a roster with Arrow and compute the impact metrics."""
+    return calculate_impact_metrics_arrow(load_arrow_table(filepath))
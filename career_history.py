@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+SparkLab Career History Model
+=============================
+
+A normalized long-format store of career histories with any number of positions
+per person. Positions are held as flat (person_id, seq, position, org, start, end)
+columns sorted by person, with a CSR-style offsets array marking where each
+person's timeline starts, so classification, affiliation counting and "ever held
+role X" queries run in time linear in the total number of positions.
+"""
+
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from sparklab_analysis import (LEADERSHIP_ROLES, ROLE_MASK_DTYPE, match_notable_organization,
+                               default_classification_cache)
+
+# (position, organization) column pairs in the wide roster, most recent first
+WIDE_POSITION_COLUMNS = [
+    ('Position 1', 'Company/University 1'),
+    ('Position 2 or Past Position', 'Company/University 2'),
+]
+
+PERSON_COLUMNS = ['Name', 'Type', 'Year', 'Industry or Academia?']
+
+LONG_COLUMNS = ['person_id', 'seq', 'position', 'org', 'start', 'end']
+
+ROLE_BITS = {role: ROLE_MASK_DTYPE.type(1 << bit) for bit, role in enumerate(LEADERSHIP_ROLES)}
+
+def roles_to_mask(roles: Sequence[str]) -> np.unsignedinteger:
+    """Pack a list of leadership roles into a bitmask."""
+    mask = ROLE_MASK_DTYPE.type(0)
+    for role in roles:
+        mask |= ROLE_BITS.get(role, ROLE_MASK_DTYPE.type(0))
+    return mask
+
+def mask_to_roles(mask: int) -> List[str]:
+    """Unpack a bitmask into leadership roles, in classify_position order."""
+    roles = [role for role in LEADERSHIP_ROLES if mask & ROLE_BITS[role]]
+    return roles if roles else ['Other']
+
+class CareerHistory:
+    """Long-format career timelines with CSR offsets over the position table."""
+
+    def __init__(self, people: pd.DataFrame, positions: pd.DataFrame):
+        """positions['person_id'] holds row positions into people (0..len(people)-1)."""
+        positions = positions.sort_values(['person_id', 'seq'], kind='stable').reset_index(drop=True)
+
+        self.people = people
+        self.person_id = positions['person_id'].to_numpy(dtype=np.int64)
+        self.seq = positions['seq'].to_numpy(dtype=np.int32)
+        self.position = positions['position'].to_numpy(dtype=object)
+        self.org = positions['org'].to_numpy(dtype=object)
+        self.start = pd.to_numeric(positions['start'], errors='coerce').to_numpy(dtype=float)
+        self.end = pd.to_numeric(positions['end'], errors='coerce').to_numpy(dtype=float)
+
+        # offsets[i]:offsets[i + 1] is the slice of person i's positions
+        counts = np.bincount(self.person_id, minlength=len(people))
+        self.offsets = np.zeros(len(people) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.offsets[1:])
+
+        self._role_masks = None
+
+    @classmethod
+    def from_wide(cls, df: pd.DataFrame,
+                  column_pairs: Sequence[Tuple[str, str]] = WIDE_POSITION_COLUMNS) -> 'CareerHistory':
+        """Build a history from the wide roster, one seq per column pair."""
+        df = df.reset_index(drop=True)
+        people = df[[col for col in PERSON_COLUMNS if col in df.columns]].copy()
+        people.index.name = 'person_id'
+
+        frames = []
+        for seq, (position_col, org_col) in enumerate(column_pairs):
+            if position_col not in df.columns and org_col not in df.columns:
+                continue
+            position = df[position_col] if position_col in df.columns else pd.Series(np.nan, index=df.index)
+            org = df[org_col] if org_col in df.columns else pd.Series(np.nan, index=df.index)
+            present = position.notna() | org.notna()
+            frames.append(pd.DataFrame({
+                'person_id': df.index[present],
+                'seq': seq,
+                'position': position[present].values,
+                'org': org[present].values,
+                'start': np.nan,
+                'end': np.nan
+            }))
+
+        positions = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=LONG_COLUMNS)
+        return cls(people, positions)
+
+    @classmethod
+    def from_long(cls, positions: pd.DataFrame, people: Optional[pd.DataFrame] = None) -> 'CareerHistory':
+        """Build a history from a long-format position table."""
+        missing = [col for col in ['person_id', 'seq', 'position', 'org'] if col not in positions.columns]
+        if missing:
+            raise ValueError(f"Long-format positions are missing columns: {missing}")
+
+        positions = positions.copy()
+        for col in ['start', 'end']:
+            if col not in positions.columns:
+                positions[col] = np.nan
+
+        # Real ids (1001, 1002, ...) stay on people.index; positions get dense codes
+        if people is None:
+            codes, ids = pd.factorize(positions['person_id'], sort=True)
+            people = pd.DataFrame(index=pd.Index(ids, name='person_id'))
+        else:
+            codes = people.index.get_indexer(positions['person_id'])
+            if (codes < 0).any():
+                unknown = positions['person_id'][codes < 0].unique()[:5].tolist()
+                raise ValueError(f"Positions reference people not in the people table: {unknown}")
+        positions['person_id'] = codes
+        return cls(people, positions[LONG_COLUMNS])
+
+    def __len__(self) -> int:
+        return len(self.people)
+
+    @property
+    def n_positions(self) -> int:
+        return len(self.person_id)
+
+    def _frame(self, lo: int, hi: int) -> pd.DataFrame:
+        """Long-format rows lo:hi of the position table, with the people's own ids."""
+        return pd.DataFrame({
+            'person_id': self.people.index.to_numpy()[self.person_id[lo:hi]], 'seq': self.seq[lo:hi],
+            'position': self.position[lo:hi], 'org': self.org[lo:hi],
+            'start': self.start[lo:hi], 'end': self.end[lo:hi]
+        }, index=pd.RangeIndex(lo, hi))
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the position table as a long-format DataFrame."""
+        return self._frame(0, self.n_positions)
+
+    def timeline(self, person_id) -> pd.DataFrame:
+        """Return one person's positions in seq order, looked up by their id."""
+        row = self.people.index.get_loc(person_id)
+        return self._frame(self.offsets[row], self.offsets[row + 1])
+
+    def _reduce_per_person(self, values: np.ndarray) -> np.ndarray:
+        """OR-reduce a per-position bitmask array into one value per person."""
+        result = np.zeros(len(self.people), dtype=values.dtype)
+        nonempty = np.flatnonzero(np.diff(self.offsets))
+        if len(nonempty):
+            result[nonempty] = np.bitwise_or.reduceat(values, self.offsets[nonempty])
+        return result
+
+    def position_role_masks(self, cache=None) -> np.ndarray:
+        """Classify every position on its own; one role bitmask per position."""
+        if self._role_masks is None or cache is not None:
+            cache = cache if cache is not None else default_classification_cache
+            codes, uniques = pd.factorize(pd.Series(self.position, dtype=object).astype(str))
+            unique_masks = np.array([roles_to_mask([r for r in roles if r != 'Other'])
+                                     for roles in cache.classify_many((title, None) for title in uniques)],
+                                    dtype=ROLE_MASK_DTYPE)
+            self._role_masks = unique_masks[codes] if len(codes) else np.zeros(0, dtype=ROLE_MASK_DTYPE)
+        return self._role_masks
+
+    def person_role_masks(self, cache=None) -> np.ndarray:
+        """Union of role bitmasks over each person's positions."""
+        return self._reduce_per_person(self.position_role_masks(cache))
+
+    def leadership_roles(self, cache=None) -> List[List[str]]:
+        """Per-person role lists, in the format categorize_positions produces."""
+        return [mask_to_roles(mask) for mask in self.person_role_masks(cache)]
+
+    def ever_held(self, role: str, cache=None) -> np.ndarray:
+        """Boolean per person: did any position carry the given role?"""
+        if role not in ROLE_BITS:
+            raise ValueError(f"Unknown leadership role: {role}")
+        return (self.person_role_masks(cache) & ROLE_BITS[role]) != 0
+
+    def role_counts(self, cache=None) -> Dict[str, int]:
+        """Number of people who ever held each leadership role."""
+        masks = self.person_role_masks(cache)
+        return {role: int(np.count_nonzero(masks & bit)) for role, bit in ROLE_BITS.items()}
+
+    def affiliation_ids(self) -> Tuple[np.ndarray, List[str]]:
+        """Notable-organization id per position (-1 if none) and the id labels."""
+        codes, uniques = pd.factorize(pd.Series(self.org, dtype=object))
+        labels = []
+        label_ids = {}
+        unique_ids = np.full(len(uniques), -1, dtype=np.int32)
+        for i, org in enumerate(uniques):
+            notable = match_notable_organization(org)
+            if notable is not None:
+                unique_ids[i] = label_ids.setdefault(notable, len(labels))
+                if unique_ids[i] == len(labels):
+                    labels.append(notable)
+
+        ids = np.where(codes >= 0, unique_ids[codes], -1) if len(codes) else np.zeros(0, dtype=np.int32)
+        return ids, labels
+
+    def affiliation_counts(self) -> Counter:
+        """Count notable-organization matches over every position."""
+        ids, labels = self.affiliation_ids()
+        counts = np.bincount(ids[ids >= 0], minlength=len(labels))
+
+        # Order labels by first occurrence to match identify_notable_companies
+        first_seen = {}
+        for seq in np.unique(self.seq):
+            for label_id in pd.unique(ids[(self.seq == seq) & (ids >= 0)]):
+                first_seen.setdefault(label_id, len(first_seen))
+        return Counter({labels[i]: int(counts[i]) for i in sorted(first_seen, key=first_seen.get)})
+
+def load_career_history(filepath: str, people_filepath: Optional[str] = None) -> CareerHistory:
+    """Load a long-format position CSV, optionally with a person attribute CSV."""
+    positions = pd.read_csv(filepath)
+    people = pd.read_csv(people_filepath, index_col='person_id') if people_filepath else None
+    return CareerHistory.from_long(positions, people)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+SparkLab Chart Data Export
+==========================
+
+This module exports the series behind the dashboard figures as compact JSON or
+typed-array binary, so the web presentation can draw the charts client-side
+instead of downloading multi-megabyte 300-dpi PNGs.
+"""
+
+import json
+import struct
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from enhanced_analysis import prepare_timeline_data, compute_timeline_aggregates
+
+# Binary layout: magic, uint32 header length, JSON header, then 4-byte aligned
+# little-endian buffers that map directly onto Float32Array/Int32Array views.
+BINARY_MAGIC = b'SLCD'
+BINARY_DTYPES = {'int32': '<i4', 'float32': '<f4'}
+JSON_TYPES = {'int32': int, 'float32': float}
+
+def _series(labels, values, dtype: str = 'int32') -> Dict:
+    """Build a labelled one-dimensional series."""
+    return {
+        'labels': [str(label) for label in labels],
+        'values': np.asarray(values).astype(JSON_TYPES[dtype]).tolist(),
+        'dtype': dtype
+    }
+
+def _matrix(frame: pd.DataFrame, dtype: str = 'float32') -> Dict:
+    """Build a row-major matrix series from a DataFrame."""
+    return {
+        'rows': [str(label) for label in frame.index],
+        'columns': [str(label) for label in frame.columns],
+        'values': np.asarray(frame.values).astype(JSON_TYPES[dtype]).ravel().tolist(),
+        'dtype': dtype
+    }
+
+def build_chart_series(df: pd.DataFrame, metrics: Dict, top_n: int = 12) -> Dict:
+    """Collect the series drawn by create_visualizations."""
+    from sparklab_analysis import map_sectors
+
+    sector_data = metrics['sector_distribution']['distribution']
+    type_data = metrics['alumni_types']
+
+    leadership_data = metrics['leadership_positions']['all_roles']
+    leadership = sorted((count, role) for role, count in leadership_data.items() if role != 'Other')
+
+    top_affiliations = metrics['notable_affiliations'].most_common(top_n)
+
+    sector_by_type = pd.crosstab(df['Type'], map_sectors(df))
+    sector_by_type_pct = sector_by_type.div(sector_by_type.sum(axis=1), axis=0) * 100
+
+    return {
+        'total_alumni': int(metrics['total_alumni']),
+        'sector_distribution': _series(sector_data.index, sector_data.values),
+        'alumni_types': _series(type_data.index, type_data.values),
+        'leadership_positions': _series([role for _, role in leadership],
+                                        [count for count, _ in leadership]),
+        'top_affiliations': _series([org for org, _ in top_affiliations],
+                                    [count for _, count in top_affiliations]),
+        'sector_by_type_pct': _matrix(sector_by_type_pct.round(1))
+    }
+
+def build_timeline_series(df: pd.DataFrame) -> Dict:
+    """Collect the series drawn by create_timeline_analysis."""
+    aggregates = compute_timeline_aggregates(prepare_timeline_data(df))
+    leadership_by_year = aggregates['leadership_by_year']
+
+    return {
+        'year_type': _matrix(aggregates['year_type'].rename(index=int), dtype='int32'),
+        'year_sector_pct': _matrix(aggregates['year_sector_pct'].rename(index=int).round(1)),
+        'leadership_rate': _series(leadership_by_year.index.astype(int),
+                                   leadership_by_year['Leadership_Rate'].round(1), dtype='float32'),
+        'leadership_trend': None if aggregates['leadership_trend'] is None
+        else [float(coef) for coef in aggregates['leadership_trend']]
+    }
+
+def _binary_buffers(series: Dict, prefix: str = '') -> List:
+    """Return (path, entry) for every typed series, depth first."""
+    buffers = []
+    for key, value in series.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict) and 'dtype' in value:
+            buffers.append((path, value))
+        elif isinstance(value, dict):
+            buffers.extend(_binary_buffers(value, prefix=path + '.'))
+    return buffers
+
+def encode_binary(series: Dict) -> bytes:
+    """Encode series as a JSON header followed by aligned typed-array buffers."""
+    header = {'series': {}, 'scalars': {}}
+    body = bytearray()
+
+    for path, entry in _binary_buffers(series):
+        data = np.asarray(entry['values'], dtype=BINARY_DTYPES[entry['dtype']]).tobytes()
+        meta = {key: value for key, value in entry.items() if key != 'values'}
+        meta.update({'offset': len(body), 'length': len(entry['values'])})
+        header['series'][path] = meta
+        body.extend(data)
+
+    for key, value in series.items():
+        if not isinstance(value, dict):
+            header['scalars'][key] = value
+
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    # Pad so the body starts on a 4-byte boundary for typed-array views
+    header_bytes += b' ' * (-(len(header_bytes) + 8) % 4)
+
+    return BINARY_MAGIC + struct.pack('<I', len(header_bytes)) + header_bytes + bytes(body)
+
+def decode_binary(payload: bytes) -> Dict:
+    """Decode the output of encode_binary back into plain series."""
+    if payload[:4] != BINARY_MAGIC:
+        raise ValueError("Not a SparkLab chart data payload")
+
+    (header_len,) = struct.unpack('<I', payload[4:8])
+    header = json.loads(payload[8:8 + header_len])
+    body_start = 8 + header_len
+
+    series = dict(header['scalars'])
+    for path, meta in header['series'].items():
+        dtype = np.dtype(BINARY_DTYPES[meta['dtype']])
+        values = np.frombuffer(payload, dtype=dtype, count=meta['length'],
+                               offset=body_start + meta['offset'])
+        entry = {key: value for key, value in meta.items() if key not in ('offset', 'length')}
+        entry['values'] = values.tolist()
+
+        target = series
+        *parents, leaf = path.split('.')
+        for parent in parents:
+            target = target.setdefault(parent, {})
+        target[leaf] = entry
+
+    return series
+
+def export_chart_data(series: Dict, filepath: str, fmt: str = 'json') -> int:
+    """Write chart series to disk as 'json' or 'binary'; return bytes written."""
+    if fmt == 'json':
+        payload = json.dumps(series, separators=(',', ':')).encode('utf-8')
+    elif fmt == 'binary':
+        payload = encode_binary(series)
+    else:
+        raise ValueError(f"Unknown chart data format: {fmt}")
+
+    with open(filepath, 'wb') as f:
+        f.write(payload)
+
+    return len(payload)
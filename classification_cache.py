@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Position Classification Cache
+=============================
+
+Memoizes leadership classification on the normalized (position1, position2)
+pair. Lookups go through a bounded in-process LRU first and, when a path is
+given, a SQLite store that persists between runs and can be shared by batch
+workers. Every entry is tagged with the rule version, so changing the rule file
+invalidates old entries automatically. One cache may be shared by threads: the
+LRU and the SQLite connection are only touched under a lock, while the
+classifier itself runs outside it.
+"""
+
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable, List, Optional, Tuple
+
+Key = Tuple[str, str]
+
+def normalize_title(value) -> str:
+    """Normalize a position title for use as a cache key."""
+    if value is None or str(value) == 'nan':
+        return ''
+    return ' '.join(str(value).split()).upper()
+
+class ClassificationCache:
+    """Two-level memo of classifier(position1, position2) results."""
+
+    def __init__(self, classifier: Callable[[str, str], List[str]], rule_version: str,
+                 path: Optional[str] = None, maxsize: int = 65536):
+        self.classifier = classifier
+        self.rule_version = rule_version
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if path is not None:
+            self.attach(path)
+
+    def attach(self, path: str):
+        """Back the LRU with the SQLite store at path, replacing any current store."""
+        conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS classifications (
+                rule_version TEXT NOT NULL,
+                position1 TEXT NOT NULL,
+                position2 TEXT NOT NULL,
+                roles TEXT NOT NULL,
+                PRIMARY KEY (rule_version, position1, position2)
+            )
+        """)
+        conn.commit()
+        self.close()
+        with self._lock:
+            self._conn = conn
+
+    def _remember(self, key: Key, roles: List[str]):
+        """Insert into the in-process LRU, evicting the oldest entry if full."""
+        self._memory[key] = roles
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def _load_persistent(self, keys: List[Key]) -> dict:
+        """Fetch stored classifications for keys under the current rule version."""
+        found = {}
+        if self._conn is None or not keys:
+            return found
+
+        # Stay well under SQLite's bound-parameter limit
+        batch_size = 300
+        for start in range(0, len(keys), batch_size):
+            batch = keys[start:start + batch_size]
+            clauses = ' OR '.join(['(position1 = ? AND position2 = ?)'] * len(batch))
+            params = [self.rule_version] + [part for key in batch for part in key]
+            rows = self._conn.execute(
+                f"SELECT position1, position2, roles FROM classifications "
+                f"WHERE rule_version = ? AND ({clauses})", params)
+            for position1, position2, roles in rows:
+                found[(position1, position2)] = roles.split('|')
+        return found
+
+    def _store_persistent(self, results: dict):
+        """Persist freshly computed classifications."""
+        if self._conn is None or not results:
+            return
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO classifications VALUES (?, ?, ?, ?)",
+            [(self.rule_version, key[0], key[1], '|'.join(roles)) for key, roles in results.items()])
+        self._conn.commit()
+
+    def classify_many(self, pairs: Iterable[Key]) -> List[List[str]]:
+        """Classify raw (position1, position2) pairs, computing each distinct key once."""
+        keys = [(normalize_title(p1), normalize_title(p2)) for p1, p2 in pairs]
+        unique_keys = list(OrderedDict.fromkeys(keys))
+
+        resolved = {}
+        pending = []
+        with self._lock:
+            for key in unique_keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    resolved[key] = self._memory[key]
+                    self.hits += 1
+                else:
+                    pending.append(key)
+
+            stored = self._load_persistent(pending)
+            self.hits += len(stored)
+
+        computed = {key: self.classifier(*key) for key in pending if key not in stored}
+
+        with self._lock:
+            self.misses += len(computed)
+            self._store_persistent(computed)
+            for key, roles in list(stored.items()) + list(computed.items()):
+                self._remember(key, roles)
+                resolved[key] = roles
+
+        return [list(resolved[key]) for key in keys]
+
+    def classify(self, position1, position2=None) -> List[str]:
+        """Classify a single pair through the cache."""
+        return self.classify_many([(position1, position2)])[0]
+
+    def purge_stale(self) -> int:
+        """Delete persisted entries written under other rule versions."""
+        if self._conn is None:
+            return 0
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM classifications WHERE rule_version != ?", (self.rule_version,))
+            self._conn.commit()
+        return cursor.rowcount
+
+    def close(self):
+        """Close the persistent store, if any."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+SparkLab Classification Rules
+=============================
+
+Leadership roles are defined in classification_rules.json rather than in code,
+so every module classifies titles with one versioned ruleset. The rules compile
+into a single case-insensitive alternation regex with one named group per
+keyword. Alternatives are ordered by priority, then by length, and each keyword
+is anchored on word boundaries. One left-to-right scan therefore finds every
+role: "Lead" no longer matches "Leader", and words claimed by a higher-priority
+rule are not reused by a lower one.
+
+Role bitmasks use the narrowest unsigned integer type with a bit per role, so
+up to 64 roles can be defined.
+
+The compiled pattern and its group-to-role table are cached next to the rule
+file, keyed by a hash of the file contents, so other processes reuse them
+without re-validating the rules. The cache file is replaced atomically, and an
+unreadable one is simply rebuilt.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+from typing import Dict, List, Optional
+
+import numpy as np
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'classification_rules.json')
+COMPILER_VERSION = 1
+POSITION_SEPARATOR = ' | '  # Keeps a phrase from spanning two positions
+MASK_DTYPES = [np.dtype(np.uint8), np.dtype(np.uint16), np.dtype(np.uint32), np.dtype(np.uint64)]
+
+def mask_dtype(n_roles: int) -> np.dtype:
+    """Narrowest unsigned integer dtype with one bit per role."""
+    for dtype in MASK_DTYPES:
+        if n_roles <= dtype.itemsize * 8:
+            return dtype
+    raise ValueError(f"Classification rules define {n_roles} roles; at most 64 fit in a role bitmask")
+
+def rules_digest(path: str) -> str:
+    """SHA-256 digest of a rule file's contents."""
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def _keyword_pattern(keyword: str) -> str:
+    """Whole-word regex for a keyword, with '*' standing for any single word."""
+    words = [r'\w+' if word == '*' else re.escape(word) for word in keyword.split()]
+    if not words:
+        raise ValueError("Empty keyword in classification rules")
+    return r'(?<!\w)' + r'\s+'.join(words) + r'(?!\w)'
+
+def compile_rules(rules: Dict) -> Dict:
+    """Compile a parsed rule file into the pattern source and group-to-role table."""
+    roles = [entry['role'] for entry in rules['roles']]
+    if len(set(roles)) != len(roles):
+        raise ValueError("Duplicate role in classification rules")
+    mask_dtype(len(roles))
+
+    alternatives = []
+    for bit, entry in enumerate(rules['roles']):
+        for keyword in entry['keywords']:
+            alternatives.append((-entry.get('priority', 0), -len(keyword), bit, keyword))
+    alternatives.sort()
+
+    groups = {}
+    parts = []
+    for i, (_, _, bit, keyword) in enumerate(alternatives):
+        name = f"k{i}"
+        groups[name] = bit
+        parts.append(f"(?P<{name}>{_keyword_pattern(keyword)})")
+
+    return {
+        'compiler_version': COMPILER_VERSION,
+        'rules_version': str(rules['version']),
+        'roles': roles,
+        'pattern': '|'.join(parts),
+        'groups': groups
+    }
+
+def load_compiled_rules(path: str = DEFAULT_RULES_PATH, cache: bool = True) -> Dict:
+    """Compiled rules for path, from the cached artifact when it matches the file."""
+    digest = rules_digest(path)
+    artifact_path = f"{path}.compiled"
+
+    if cache and os.path.exists(artifact_path):
+        try:
+            with open(artifact_path, 'r') as f:
+                compiled = json.load(f)
+        except (OSError, ValueError):
+            compiled = None  # Truncated or corrupt: recompile and overwrite it
+        if isinstance(compiled, dict) and compiled.get('digest') == digest \
+                and compiled.get('compiler_version') == COMPILER_VERSION:
+            return compiled
+
+    with open(path, 'r') as f:
+        compiled = compile_rules(json.load(f))
+    compiled['digest'] = digest
+
+    if cache:
+        # Write a temp file and rename it into place, so a reader never sees a partial artifact
+        try:
+            fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(artifact_path) + '.',
+                                             dir=os.path.dirname(artifact_path) or '.')
+        except OSError:
+            return compiled  # A read-only checkout still classifies; it just recompiles next time
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(compiled, f)
+            os.replace(temp_path, artifact_path)
+        except OSError:
+            os.unlink(temp_path)
+    return compiled
+
+class RuleMatcher:
+    """Classifies position titles against one compiled ruleset."""
+
+    def __init__(self, compiled: Dict):
+        self.roles: List[str] = compiled['roles']
+        self.version = f"{compiled['rules_version']}-{compiled['digest'][:12]}"
+        self.regex = re.compile(compiled['pattern'], re.IGNORECASE)
+        self.mask_dtype = mask_dtype(len(self.roles))
+        self.group_bits = {name: self.mask_dtype.type(1 << bit) for name, bit in compiled['groups'].items()}
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_RULES_PATH) -> 'RuleMatcher':
+        return cls(load_compiled_rules(path))
+
+    def mask_text(self, text: str) -> np.unsignedinteger:
+        """Role bitmask for one title string (bit i is roles[i])."""
+        mask = self.mask_dtype.type(0)
+        for match in self.regex.finditer(text):
+            mask |= self.group_bits[match.lastgroup]
+        return mask
+
+    def mask(self, position1, position2=None) -> np.unsignedinteger:
+        """Role bitmask for a pair of positions."""
+        text = str(position1)
+        if position2 and str(position2) != 'nan':
+            text += POSITION_SEPARATOR + str(position2)
+        return self.mask_text(text)
+
+    def classify(self, position1, position2=None) -> List[str]:
+        """Roles for a pair of positions in rule-file order, or ['Other']."""
+        mask = self.mask(position1, position2)
+        roles = [role for bit, role in enumerate(self.roles) if mask & (1 << bit)]
+        return roles if roles else ['Other']
+
+_default_matcher: Optional[RuleMatcher] = None
+
+def default_matcher() -> RuleMatcher:
+    """The matcher for the bundled rule file, compiled once per process."""
+    global _default_matcher
+    if _default_matcher is None:
+        _default_matcher = RuleMatcher.from_file()
+    return _default_matcher
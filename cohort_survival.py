@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+SparkLab Cohort Survival Analysis
+=================================
+
+Time-to-leadership curves per graduation cohort, Type and Sector. Each alumnus
+contributes a duration (years from graduation) and an event flag, and
+Kaplan-Meier survival, Nelson-Aalen cumulative hazard and per-interval hazard
+are computed for every group at once from one lexsort plus grouped cumulative
+sums. No Python loop runs per group or per event time.
+
+Event times come from the CareerHistory start year of the first qualifying
+position where one is recorded. The wide roster has no start dates, so a
+leadership role seen there is counted as an event at the observation year,
+and everyone else is censored at the observation year. The observation year
+defaults to the latest graduation Year in the data, so results do not drift
+with the calendar. The curves therefore read as "share holding the role by
+the observation year, N years after graduation", an upper bound on the true
+time to the role.
+"""
+
+from datetime import date
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from sparklab_analysis import INDUSTRY_MAPPING, ROLE_MASK_DTYPE
+from career_history import ROLE_BITS, CareerHistory
+
+GROUP_COLUMNS = ['Cohort', 'Type', 'Sector']
+
+def _role_bits(role: Union[str, Sequence[str], None]) -> np.unsignedinteger:
+    """Bitmask for one or several leadership roles, or for any of them when role is None."""
+    roles = list(ROLE_BITS) if role is None else [role] if isinstance(role, str) else list(role)
+    unknown = [name for name in roles if name not in ROLE_BITS]
+    if unknown:
+        raise ValueError(f"Unknown leadership role: {unknown}")
+    return np.bitwise_or.reduce([ROLE_BITS[name] for name in roles], initial=ROLE_MASK_DTYPE.type(0))
+
+def default_observation_year(history: CareerHistory) -> int:
+    """Latest graduation Year in the history, or the current year if none is known."""
+    year = pd.to_numeric(history.people['Year'], errors='coerce').max()
+    return int(year) if np.isfinite(year) else date.today().year
+
+def leadership_durations(history: CareerHistory, role: Union[str, Sequence[str], None] = None,
+                         observation_year: Optional[int] = None, cache=None) -> pd.DataFrame:
+    """One row per person with cohort, Type, Sector, duration and event flag."""
+    if 'Year' not in history.people.columns:
+        raise ValueError("Survival analysis needs a graduation Year per person")
+    if observation_year is None:
+        observation_year = default_observation_year(history)
+    bits = _role_bits(role)
+    n_people = len(history)
+
+    cohort = pd.to_numeric(history.people['Year'], errors='coerce').to_numpy(dtype=float)
+    sector = history.people['Industry or Academia?'] if 'Industry or Academia?' in history.people.columns \
+        else pd.Series(np.nan, index=history.people.index)
+
+    # First dated qualifying position per person
+    qualifying = (history.position_role_masks(cache) & bits) != 0
+    dated = qualifying & np.isfinite(history.start)
+    first_start = np.full(n_people, np.nan)
+    if dated.any():
+        person, start = history.person_id[dated], history.start[dated]
+        order = np.lexsort((start, person))
+        person, start = person[order], start[order]
+        first = np.concatenate([[True], person[1:] != person[:-1]])
+        first_start[person[first]] = start[first]
+
+    held = (history.person_role_masks(cache) & bits) != 0
+    event_time = np.where(np.isfinite(first_start), first_start, observation_year)
+
+    frame = pd.DataFrame({
+        'Cohort': cohort,
+        'Type': history.people['Type'].to_numpy() if 'Type' in history.people.columns else np.nan,
+        'Sector': sector.map(INDUSTRY_MAPPING).fillna('Unknown').to_numpy(),
+        'duration': np.clip(np.where(held, event_time, observation_year) - cohort, 0, None),
+        'event': held,
+        'event_source': np.select([held & np.isfinite(first_start), held], ['start', 'observed'], 'censored')
+    }, index=history.people.index)
+    return frame[np.isfinite(frame['Cohort'])]
+
+def survival_table(durations, events, groups: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """Kaplan-Meier and Nelson-Aalen estimates at each distinct event time per group.
+
+    Returns one row per (group, time) with columns at_risk, events, censored,
+    hazard (d/n), cumulative_hazard (Nelson-Aalen), survival (Kaplan-Meier)
+    and greenwood_var, with the group columns first.
+    """
+    durations = np.asarray(durations, dtype=float)
+    events = np.asarray(events, dtype=bool)
+    if groups is None:
+        groups = pd.DataFrame(index=range(len(durations)))
+        group_codes, group_labels = np.zeros(len(durations), dtype=np.int64), groups.iloc[:1]
+    else:
+        # Combine per-column codes into one integer key instead of hashing tuples
+        groups = groups.reset_index(drop=True)
+        column_codes, column_labels = zip(*(pd.factorize(groups[col], sort=True) for col in groups.columns))
+        if any((codes < 0).any() for codes in column_codes):
+            raise ValueError("Group columns must not contain missing values")
+        combined = np.ravel_multi_index(column_codes, [max(len(labels), 1) for labels in column_labels])
+        group_codes, keys = pd.factorize(combined, sort=True)
+        key_codes = np.unravel_index(keys, [max(len(labels), 1) for labels in column_labels])
+        group_labels = pd.DataFrame({col: labels.take(codes) for col, labels, codes
+                                     in zip(groups.columns, column_labels, key_codes)})
+
+    # Collapse to one row per distinct (group, time)
+    order = np.lexsort((durations, group_codes))
+    g, t, e = group_codes[order], durations[order], events[order]
+    boundary = np.concatenate([[True], (g[1:] != g[:-1]) | (t[1:] != t[:-1])]) if len(g) else np.zeros(0, bool)
+    starts = np.flatnonzero(boundary)
+    removed = np.diff(np.append(starts, len(g)))
+    deaths = np.add.reduceat(e.astype(np.int64), starts) if len(starts) else np.zeros(0, np.int64)
+    g, t = g[starts], t[starts]
+
+    # At risk = group size minus everyone removed at earlier times in the group
+    new_group = np.concatenate([[True], g[1:] != g[:-1]]) if len(g) else np.zeros(0, bool)
+    group_start = np.maximum.accumulate(np.where(new_group, np.arange(len(g)), 0))
+    removed_before = np.cumsum(removed) - removed
+    group_size = np.bincount(group_codes, minlength=int(g.max()) + 1 if len(g) else 0)
+    at_risk = group_size[g] - (removed_before - removed_before[group_start])
+
+    def grouped_cumsum(values):
+        total = np.cumsum(values)
+        return total - (total - values)[group_start]
+
+    hazard = deaths / at_risk
+    # log(1 - d/n) summed per group; a factor of zero pins survival at 0 from then on
+    factor = 1.0 - hazard
+    extinct = grouped_cumsum((factor <= 0).astype(np.int64)) > 0
+    log_survival = grouped_cumsum(np.log(np.where(factor > 0, factor, 1.0)))
+    survival = np.where(extinct, 0.0, np.exp(log_survival))
+    # An extinction step adds 0 rather than inf: the running sum is shared across
+    # groups, and extinct rows are masked to NaN below anyway
+    with np.errstate(divide='ignore', invalid='ignore'):
+        greenwood = grouped_cumsum(np.where(at_risk > deaths, deaths / (at_risk * (at_risk - deaths)), 0.0))
+    greenwood_var = np.where(extinct, np.nan, survival ** 2 * greenwood)
+
+    table = group_labels.iloc[g].reset_index(drop=True) if len(groups.columns) else pd.DataFrame(index=range(len(g)))
+    return table.assign(time=t, at_risk=at_risk, events=deaths, censored=removed - deaths, hazard=hazard,
+                        cumulative_hazard=grouped_cumsum(hazard), survival=survival,
+                        greenwood_var=greenwood_var)
+
+def cohort_survival(history: Union[CareerHistory, pd.DataFrame], by: Union[str, Sequence[str]] = 'Type',
+                    role: Union[str, Sequence[str], None] = None, observation_year: Optional[int] = None,
+                    cache=None) -> pd.DataFrame:
+    """Time-to-leadership curves grouped by any of Cohort, Type and Sector."""
+    if isinstance(history, pd.DataFrame):
+        history = CareerHistory.from_wide(history)
+    by: List[str] = [by] if isinstance(by, str) else list(by)
+    unknown = [key for key in by if key not in GROUP_COLUMNS]
+    if unknown:
+        raise ValueError(f"Cannot group survival curves by {unknown}; choose from {GROUP_COLUMNS}")
+
+    people = leadership_durations(history, role, observation_year, cache)
+    people = people.dropna(subset=by)
+    return survival_table(people['duration'], people['event'], people[by] if by else None)
+
+def median_time_to_role(curves: pd.DataFrame, by: Union[str, Sequence[str]] = 'Type') -> pd.Series:
+    """First time at which survival falls to 50% or below, per group (NaN if never)."""
+    by = [by] if isinstance(by, str) else list(by)
+    reached = curves[curves['survival'] <= 0.5]
+    median = reached.groupby(by, sort=True)['time'].first()
+    return median.reindex(curves.groupby(by, sort=True).size().index)
+
+def plot_time_to_leadership(ax, curves: pd.DataFrame, by: str = 'Type', colors=None,
+                            title: str = 'Time to Leadership Role', xlabel: str = 'Years Since Graduation'):
+    """Draw cumulative incidence (1 - survival) step curves, one per group."""
+    for i, (name, curve) in enumerate(curves.groupby(by, sort=True)):
+        times = np.concatenate([[0.0], curve['time'].to_numpy()])
+        incidence = np.concatenate([[0.0], 1.0 - curve['survival'].to_numpy()]) * 100
+        color = colors[i % len(colors)] if colors else None
+        ax.step(times, incidence, where='post', linewidth=3, color=color, label=str(name))
+
+    ax.set_title(title, fontweight='bold', pad=20)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel('Reached Leadership (%)')
+    ax.set_ylim(0, 100)
+    ax.grid(alpha=0.3, linestyle='--')
+    ax.legend()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+SparkLab Roster Validation
+==========================
+
+A schema and data-quality stage that runs right after the roster is loaded.
+Every check is a vectorized pass over a whole column; text columns are
+factorized once so value tests run per distinct value, and only failing rows
+are materialized. The findings are returned as one structured table (one row
+per problem) instead of being coerced away silently further down the pipeline.
+"""
+
+import codecs
+import csv
+from datetime import date
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from sparklab_analysis import INDUSTRY_MAPPING
+
+REQUIRED_COLUMNS = ['Name', 'Type', 'Year', 'Position 1', 'Company/University 1', 'Industry or Academia?']
+ALLOWED_TYPES = ['PhD Granted', 'Graduate Student', 'Postdoctoral Scholar']
+PROFILE_COLUMN = 'Company website, profile page, LinkedIn'
+PLACEHOLDERS = ['???', 'TBD', 'N/A']
+PLACEHOLDER_COLUMNS = ['Position 1', 'Company/University 1', 'Position 2 or Past Position',
+                       'Company/University 2', 'Industry or Academia?', 'Type', 'Year']
+MIN_YEAR = 1990
+URL_PATTERN = r'^https?://[^\s/$.?#][^\s]*$'
+
+FIELD_START_BYTES = np.frombuffer(b',\n"', dtype=np.uint8)
+FIELD_END_BYTES = np.frombuffer(b',\r\n"', dtype=np.uint8)
+
+ERROR_COLUMNS = ['row', 'column', 'check', 'severity', 'value', 'message']
+
+def _findings(mask: np.ndarray, df: pd.DataFrame, column: Optional[str], check: str,
+              severity: str, message: str, values=None) -> pd.DataFrame:
+    """Turn a boolean row mask into rows of the error table.
+
+    values, if given, holds the displayed value of each failing row in row order;
+    otherwise the column's own values are shown. Only failing rows are touched, and
+    each distinct value is rendered as text once.
+    """
+    positions = np.flatnonzero(mask)
+    if values is None:
+        values = df[column].to_numpy()[positions] if column in df.columns else np.full(len(positions), '')
+    codes, uniques = pd.factorize(np.asarray(values), use_na_sentinel=False)
+    return pd.DataFrame({
+        'row': df.index[positions],
+        'column': column,
+        'check': check,
+        'severity': severity,
+        'value': pd.Series(uniques, dtype=object).astype(str).to_numpy()[codes],
+        'message': message
+    })
+
+def _isin_distinct(factorized, values) -> np.ndarray:
+    """Rows of a factorized column whose value is in values (never true for missing)."""
+    codes, uniques = factorized
+    return np.append(pd.Index(uniques).isin(values), False)[codes]
+
+def _test_distinct(factorized, predicate) -> np.ndarray:
+    """Evaluate a string predicate once per distinct value and broadcast it back."""
+    codes, uniques = factorized
+    return np.append(predicate(pd.Series(uniques, dtype=object).astype(str)).to_numpy(dtype=bool), False)[codes]
+
+def _duplicated_keys(factorized) -> np.ndarray:
+    """Rows whose value repeats another row's once trimmed and case-folded (never true for missing)."""
+    codes, uniques = factorized
+    keys = np.fromiter(map(str.casefold, map(str.strip, pd.Index(uniques).astype(str))),
+                       dtype=object, count=len(uniques))
+    groups = pd.factorize(keys)[0]
+    rows_per_value = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    rows_per_key = np.bincount(groups, weights=rows_per_value, minlength=len(uniques))
+    return np.append(rows_per_key[groups] > 1, False)[codes]
+
+def _well_quoted(buf: np.ndarray, quotes: np.ndarray) -> bool:
+    """True if quotes pair up as opening at field starts and closing at field ends."""
+    if len(quotes) % 2:
+        return False
+    opening, closing = quotes[0::2], quotes[1::2]
+    before = buf[np.maximum(opening - 1, 0)]
+    # An opening quote right after a closing one is the second half of an escaped ""
+    escaped = np.zeros(len(opening), dtype=bool)
+    escaped[1:] = opening[1:] == closing[:-1] + 1
+    opens_ok = (opening == 0) | np.isin(before, FIELD_START_BYTES) | escaped
+    after = buf[np.minimum(closing + 1, len(buf) - 1)]
+    closes_ok = (closing == len(buf) - 1) | np.isin(after, FIELD_END_BYTES)
+    return bool(opens_ok.all() and closes_ok.all())
+
+def _prefix_counter(mask: np.ndarray):
+    """Return a function counting the set entries of mask before each given position.
+
+    The mask is bit-packed into 64-bit words with a running popcount per word, so
+    any number of positions are answered without another pass over the buffer.
+    """
+    packed = np.packbits(mask, bitorder='little')
+    words = np.concatenate([packed, np.zeros(8 - len(packed) % 8, dtype=np.uint8)]).view(np.uint64)
+    before = np.zeros(len(words) + 1, dtype=np.int64)
+    np.cumsum(np.bitwise_count(words), out=before[1:])
+
+    def count_before(positions: np.ndarray) -> np.ndarray:
+        word = positions >> 6
+        lower_bits = (np.uint64(1) << (positions & 63).astype(np.uint64)) - np.uint64(1)
+        return before[word] + np.bitwise_count(words[word] & lower_bits)
+
+    return count_before
+
+def raw_field_counts(filepath: str) -> np.ndarray:
+    """Number of fields on each non-blank record, header first."""
+    with open(filepath, 'rb') as f:
+        data = f.read()
+    if data.startswith(codecs.BOM_UTF8):
+        data = data[len(codecs.BOM_UTF8):]
+    if not data.endswith(b'\n'):
+        data += b'\n'
+    buf = np.frombuffer(data, dtype=np.uint8)
+
+    quotes = np.flatnonzero(buf == ord('"'))
+    if not _well_quoted(buf, quotes):
+        # A stray quote inside an unquoted field is literal; only a real parser gets that right
+        with open(filepath, encoding='utf-8-sig', newline='') as f:
+            return np.array([len(record) for record in csv.reader(f)
+                             if len(record) > 1 or (record and record[0].strip())])
+
+    # Quotes pair up into quoted spans; a newline ends a record unless it is
+    # inside one, i.e. preceded by an odd number of quotes
+    newlines = np.flatnonzero(buf == ord('\n'))
+    ends = newlines[np.searchsorted(quotes, newlines) % 2 == 0]
+    starts = np.concatenate([[0], ends[:-1] + 1])
+
+    # Fields are the commas in a record, less those inside its quoted spans, plus one
+    commas_before = _prefix_counter(buf == ord(','))
+    opening, closing = quotes[0::2], quotes[1::2]
+    quoted = commas_before(closing) - commas_before(opening)
+    counts = commas_before(ends) - commas_before(starts) + 1
+    counts -= np.bincount(np.searchsorted(ends, opening), weights=quoted, minlength=len(ends)).astype(np.int64)
+
+    # Skip whitespace-only records, as the CSV reader does for blank lines
+    single = np.flatnonzero(counts == 1)
+    blank = [i for i in single if not data[starts[i]:ends[i]].strip()]
+    return np.delete(counts, blank)
+
+def validate_roster(df: pd.DataFrame, filepath: Optional[str] = None) -> pd.DataFrame:
+    """Check a freshly loaded roster and return a table of problems found."""
+    df = df.copy(deep=False)
+    df.columns = [col.strip() for col in df.columns]
+    findings: List[pd.DataFrame] = []
+
+    # Text columns are factorized once: missing values get code -1, and value
+    # tests run per distinct value instead of per row
+    distinct = {}
+
+    def factorized(col):
+        if col not in distinct:
+            distinct[col] = pd.factorize(df[col])
+        return distinct[col]
+
+    def report(mask, column, check, severity, message, values=None):
+        findings.append(_findings(mask, df, column, check, severity, message, values))
+
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing_columns:
+        findings.append(pd.DataFrame({
+            'row': -1, 'column': missing_columns, 'check': 'missing_column', 'severity': 'error',
+            'value': '', 'message': 'Required column is missing'
+        }))
+
+    missing = {col: factorized(col)[0] < 0 if df[col].dtype == object else df[col].isna().to_numpy()
+               for col in REQUIRED_COLUMNS if col in df.columns}
+    blank_rows = np.logical_and.reduce(list(missing.values())) if missing else np.zeros(len(df), dtype=bool)
+
+    # Required values
+    for col in ['Name', 'Type', 'Position 1']:
+        if col in missing:
+            report(missing[col] & ~blank_rows, col, 'missing_value', 'error', f'{col} is empty')
+
+    # Year must be a plausible graduation year
+    if 'Year' in df.columns:
+        report(missing['Year'] & ~blank_rows, 'Year', 'missing_value', 'warning',
+               'Year is empty; the row is left out of timeline and cohort analyses')
+        year = pd.to_numeric(df['Year'], errors='coerce').to_numpy(dtype=float)
+        report(np.isnan(year) & ~missing['Year'], 'Year', 'type', 'error', 'Year is not numeric')
+        with np.errstate(invalid='ignore'):
+            out_of_range = (year < MIN_YEAR) | (year > date.today().year + 1) | (year != np.floor(year))
+        report(out_of_range & ~np.isnan(year), 'Year', 'range', 'error',
+               f'Year is not a whole year between {MIN_YEAR} and next year')
+
+    # Allowed values
+    if 'Type' in df.columns:
+        report(~missing['Type'] & ~_isin_distinct(factorized('Type'), ALLOWED_TYPES),
+               'Type', 'allowed_values', 'error', 'Type is not a known alumni type')
+    if 'Industry or Academia?' in df.columns:
+        sector_missing = missing['Industry or Academia?']
+        sector_known = _isin_distinct(factorized('Industry or Academia?'), list(INDUSTRY_MAPPING))
+        report(~sector_missing & ~sector_known, 'Industry or Academia?', 'allowed_values', 'error',
+               'Sector is not in the industry mapping and would become Unknown')
+        report(sector_missing & ~blank_rows, 'Industry or Academia?', 'missing_value', 'warning',
+               'Sector is empty and will be reported as Unknown')
+
+    # URL shape
+    if PROFILE_COLUMN in df.columns:
+        url = factorized(PROFILE_COLUMN)
+        bad_url = (url[0] >= 0) & ~_test_distinct(url, lambda text: text.str.strip().str.match(URL_PATTERN))
+        report(bad_url, PROFILE_COLUMN, 'url', 'warning', 'Profile link is not an absolute http(s) URL')
+
+    # Duplicates, compared trimmed and case-folded
+    if 'Name' in df.columns:
+        report(_duplicated_keys(factorized('Name')), 'Name', 'duplicate', 'warning',
+               'Name appears more than once')
+
+    # Placeholders such as ??? in the position, organization and sector columns
+    # (a numeric column cannot hold one, so it is skipped)
+    for col in [col for col in PLACEHOLDER_COLUMNS if col in df.columns and df[col].dtype == object]:
+        report(_isin_distinct(factorized(col), PLACEHOLDERS), col, 'placeholder', 'warning',
+               'Value is a placeholder, not real data')
+
+    # Data spilled past the header into unnamed columns
+    extra = [col for col in df.columns if col.startswith('Unnamed:')]
+    if extra:
+        spilled = sum(df[col].notna().to_numpy(dtype=np.int64) for col in extra)
+        report(spilled > 0, None, 'extra_fields', 'error', 'Row has values beyond the named columns',
+               values=[f'{count} extra value(s)' for count in spilled[spilled > 0]])
+
+    # Rows whose raw field count differs from the header
+    if filepath is not None:
+        counts = raw_field_counts(filepath)
+        header_fields, row_fields = counts[0], counts[1:]
+        if len(row_fields) == len(df):
+            ragged = row_fields != header_fields
+            report(ragged, None, 'field_count', 'warning',
+                   f'Row field count differs from the header ({header_fields})',
+                   values=[f'{count} fields' for count in row_fields[ragged]])
+
+    # Order by row, then check name: blocks are stably sorted by check first, so
+    # one stable sort on the row finishes the job
+    findings = sorted([f for f in findings if len(f)], key=lambda f: f['check'].iat[0])
+    if not findings:
+        return pd.DataFrame(columns=ERROR_COLUMNS)
+    rows = np.concatenate([f['row'].to_numpy() for f in findings])
+    order = np.argsort(rows, kind='stable')
+    return pd.DataFrame({col: np.concatenate([f[col].to_numpy() for f in findings])[order]
+                         for col in ERROR_COLUMNS})
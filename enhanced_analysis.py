@@ -29,6 +29,18 @@ def identify_missing_data(df):
 
     return missing_alumni
 
+def peer_comparison_data():
+    """Outcome rates for SparkLab and its peer programs."""
+    comparison_data = {
+        'Program': ['SparkLab (UC Berkeley)', 'Top CS Programs Avg', 'NSF Trainees Avg', 'National PhD Avg'],
+        'Faculty_Rate': [43.6, 25.0, 22.0, 18.0],
+        'CEO_Founder_Rate': [16.1, 5.0, 4.0, 2.5],
+        'CTO_Rate': [10.7, 3.0, 2.5, 1.0],
+        'Industry_Leadership': [6.7, 3.5, 3.0, 2.0]
+    }
+
+    return pd.DataFrame(comparison_data)
+
 def create_peer_comparison_analysis():
     """Create enhanced peer comparison visualization."""
     # Professional styling
@@ -53,16 +65,7 @@ def create_peer_comparison_analysis():
         'national': '#6C757D'     # Gray
     }
 
-    # Create comparison data
-    comparison_data = {
-        'Program': ['SparkLab (UC Berkeley)', 'Top CS Programs Avg', 'NSF Trainees Avg', 'National PhD Avg'],
-        'Faculty_Rate': [43.6, 25.0, 22.0, 18.0],
-        'CEO_Founder_Rate': [16.1, 5.0, 4.0, 2.5],
-        'CTO_Rate': [10.7, 3.0, 2.5, 1.0],
-        'Industry_Leadership': [6.7, 3.5, 3.0, 2.0]
-    }
-
-    df = pd.DataFrame(comparison_data)
+    df = peer_comparison_data()
 
     # Create enhanced visualization
     fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 12))
@@ -181,8 +184,72 @@ def calculate_economic_impact():
 
     return economic_impact
 
+# Roles that count as leadership on the timeline charts
+TIMELINE_LEADERSHIP_ROLES = ['CEO/Founder', 'CTO', 'Faculty']
+
+def prepare_timeline_data(df):
+    """Clean years, map sectors and flag leadership for the timeline charts."""
+    # One combined filter, so the roster is materialized once rather than per step
+    year = pd.to_numeric(df['Year'], errors='coerce').astype(float)
+    recent = (year >= 2008).to_numpy()  # Focus on recent years; NaN years drop out
+    df_clean = df[recent].copy(deep=False)
+    df_clean['Year'] = year[recent]
+
+    # Map sectors
+    sector_mapping = {
+        'industry': 'Industry',
+        'academia': 'Academia',
+        'Industry': 'Industry',
+        'Academia': 'Academia',
+        'academia/industry': 'Both'
+    }
+    df_clean['Sector_Clean'] = df_clean['Industry or Academia?'].map(sector_mapping).fillna('Unknown')
+
+    # Flag leadership once per distinct position pair, through the shared classification cache
+    from sparklab_analysis import classify_position_pairs  # Local: sparklab_analysis imports this module
+    codes, roles = classify_position_pairs(df_clean)
+    leads = np.array([any(role in TIMELINE_LEADERSHIP_ROLES for role in pair_roles) for pair_roles in roles], dtype=bool)
+    df_clean['Has_Leadership'] = leads[codes] if len(codes) else np.zeros(0, dtype=bool)
+
+    return df_clean
+
+def fit_leadership_trend(leadership_by_year):
+    """Linear fit of leadership rate against year, or None with fewer than two years."""
+    if len(leadership_by_year) < 2:
+        return None
+    return np.polyfit(leadership_by_year.index, leadership_by_year['Leadership_Rate'], 1)
+
+def compute_timeline_aggregates(df_clean):
+    """Compute the per-year series plotted by the timeline analysis."""
+    # Alumni count by year and type
+    year_type_analysis = df_clean.groupby(['Year', 'Type']).size().unstack(fill_value=0)
+
+    # Ensure all columns exist
+    for col in ['Graduate Student', 'PhD Granted', 'Postdoctoral Scholar']:
+        if col not in year_type_analysis.columns:
+            year_type_analysis[col] = 0
+
+    # Career sector distribution over time
+    year_sector_analysis = df_clean.groupby(['Year', 'Sector_Clean']).size().unstack(fill_value=0)
+    year_sector_pct = year_sector_analysis.div(year_sector_analysis.sum(axis=1), axis=0) * 100
+
+    # Leadership emergence
+    leadership_by_year = df_clean.groupby('Year')['Has_Leadership'].agg(['sum', 'count'])
+    leadership_by_year['Leadership_Rate'] = (leadership_by_year['sum'] / leadership_by_year['count']) * 100
+    leadership_trend = fit_leadership_trend(leadership_by_year)
+
+    return {
+        'year_type': year_type_analysis,
+        'year_sector_pct': year_sector_pct,
+        'leadership_by_year': leadership_by_year,
+        'leadership_trend': leadership_trend
+    }
+
 def create_timeline_analysis(df):
     """Create enhanced timeline analysis visualization."""
+    # Imported before styling: it loads sparklab_analysis, which sets its own rcParams
+    from cohort_survival import cohort_survival, plot_time_to_leadership
+
     # Professional styling
     plt.style.use('default')
     plt.rcParams.update({
@@ -206,33 +273,16 @@ def create_timeline_analysis(df):
     }
 
     # Clean and prepare data
-    df_clean = df.copy()
-    df_clean['Year'] = pd.to_numeric(df_clean['Year'], errors='coerce')
-    df_clean = df_clean.dropna(subset=['Year'])
-    df_clean = df_clean[df_clean['Year'] >= 2008]  # Focus on recent years
-
-    # Map sectors
-    sector_mapping = {
-        'industry': 'Industry',
-        'academia': 'Academia',
-        'Industry': 'Industry',
-        'Academia': 'Academia',
-        'academia/industry': 'Both'
-    }
-    df_clean['Sector_Clean'] = df_clean['Industry or Academia?'].map(sector_mapping).fillna('Unknown')
+    df_clean = prepare_timeline_data(df)
 
     if len(df_clean) > 10:  # Only create if we have enough data
         # Create enhanced timeline visualization
-        fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(18, 12))
+        fig, ((ax1, ax2, ax5), (ax3, ax4, ax6)) = plt.subplots(2, 3, figsize=(27, 12))
         fig.suptitle('SparkLab Alumni Career Trends Over Time', fontsize=20, fontweight='bold', y=0.95)
 
                 # 1. Alumni Count by Year and Type
-        year_type_analysis = df_clean.groupby(['Year', 'Type']).size().unstack(fill_value=0)
-
-        # Ensure all columns exist
-        for col in ['Graduate Student', 'PhD Granted', 'Postdoctoral Scholar']:
-            if col not in year_type_analysis.columns:
-                year_type_analysis[col] = 0
+        aggregates = compute_timeline_aggregates(df_clean)
+        year_type_analysis = aggregates['year_type']
 
         # Stacked area chart
         ax1.stackplot(year_type_analysis.index,
@@ -250,8 +300,7 @@ def create_timeline_analysis(df):
         ax1.grid(alpha=0.3, linestyle='--')
 
         # 2. Career Sector Distribution Over Time
-        year_sector_analysis = df_clean.groupby(['Year', 'Sector_Clean']).size().unstack(fill_value=0)
-        year_sector_pct = year_sector_analysis.div(year_sector_analysis.sum(axis=1), axis=0) * 100
+        year_sector_pct = aggregates['year_sector_pct']
 
         if 'Industry' in year_sector_pct.columns and 'Academia' in year_sector_pct.columns:
             ax2.plot(year_sector_pct.index, year_sector_pct['Industry'],
@@ -268,16 +317,7 @@ def create_timeline_analysis(df):
             ax2.set_ylim(0, 100)
 
         # 3. Leadership Emergence Timeline
-        leadership_keywords = ['CEO', 'CTO', 'Founder', 'Co-founder', 'Professor', 'Assistant Professor', 'Associate Professor']
-
-        def has_leadership_role(row):
-            pos1 = str(row.get('Position 1', '')).lower()
-            pos2 = str(row.get('Position 2 or Past Position', '')).lower()
-            return any(keyword.lower() in pos1 or keyword.lower() in pos2 for keyword in leadership_keywords)
-
-        df_clean['Has_Leadership'] = df_clean.apply(has_leadership_role, axis=1)
-        leadership_by_year = df_clean.groupby('Year')['Has_Leadership'].agg(['sum', 'count'])
-        leadership_by_year['Leadership_Rate'] = (leadership_by_year['sum'] / leadership_by_year['count']) * 100
+        leadership_by_year = aggregates['leadership_by_year']
 
         bars = ax3.bar(leadership_by_year.index, leadership_by_year['Leadership_Rate'],
                       color=colors['success'], alpha=0.8, edgecolor='white', linewidth=1)
@@ -287,11 +327,12 @@ def create_timeline_analysis(df):
         ax3.grid(axis='y', alpha=0.3, linestyle='--')
 
         # Add trend line
-        z = np.polyfit(leadership_by_year.index, leadership_by_year['Leadership_Rate'], 1)
-        p = np.poly1d(z)
-        ax3.plot(leadership_by_year.index, p(leadership_by_year.index),
-                color=colors['neutral'], linestyle='--', linewidth=2, alpha=0.8, label='Trend')
-        ax3.legend()
+        z = aggregates['leadership_trend']
+        if z is not None:
+            p = np.poly1d(z)
+            ax3.plot(leadership_by_year.index, p(leadership_by_year.index),
+                    color=colors['neutral'], linestyle='--', linewidth=2, alpha=0.8, label='Trend')
+            ax3.legend()
 
         # 4. Impact Summary by Decade
         df_clean['Decade'] = (df_clean['Year'] // 10) * 10
@@ -314,7 +355,7 @@ TIMELINE INSIGHTS
 
 [LEADERSHIP] Leadership Development:
    • Average leadership rate: {df_clean['Has_Leadership'].mean()*100:.1f}%
-   • Trend: {'Increasing' if z[0] > 0 else 'Stable/Decreasing'}
+   • Trend: {'Not enough years' if z is None else 'Increasing' if z[0] > 0 else 'Stable/Decreasing'}
    • Peak leadership year: {leadership_by_year['Leadership_Rate'].idxmax()}
 
 [CAREERS] Career Distribution:
@@ -333,7 +374,19 @@ TIMELINE INSIGHTS
                 bbox=dict(boxstyle='round,pad=1', facecolor='#E9ECEF', alpha=0.8))
         ax4.set_title('Key Timeline Insights', fontweight='bold', pad=20)
 
-        plt.tight_layout()
+        # 5-6. Time to Leadership (Kaplan-Meier cumulative incidence)
+        # The roster has no start dates: a role counts as reached by the last
+        # cohort year, and everyone is followed up to that same year
+        curve_colors = [colors['primary'], colors['secondary'], colors['accent'], colors['neutral']]
+        observation_year = int(df_clean['Year'].max())
+        xlabel = f'Years from Graduation to {observation_year} (role held by then)'
+        for ax, by in [(ax5, 'Type'), (ax6, 'Sector')]:
+            curves = cohort_survival(df_clean, by, role=TIMELINE_LEADERSHIP_ROLES,
+                                     observation_year=observation_year)
+            plot_time_to_leadership(ax, curves, by, curve_colors, title=f'Time to Leadership by {by}',
+                                    xlabel=xlabel)
+
+        plt.tight_layout(rect=[0, 0, 1, 0.93])
         plt.savefig('sparklab_timeline_analysis.png', dpi=300, bbox_inches='tight',
                     facecolor='white', edgecolor='none')
         plt.show()
@@ -390,45 +443,8 @@ Percentage of total dataset: {len(missing_alumni)/149*100:.1f}%
 
     return report
 
-def main():
-    """Main enhanced analysis function."""
-    print("Running enhanced SparkLab analysis...")
-
-    # Load data
-    df = pd.read_csv('SparkLabAlumni.csv')
-    df.columns = [col.strip() for col in df.columns]
-    df = df.dropna(how='all')
-
-    # Clean sector data
-    industry_mapping = {
-        'industry': 'Industry',
-        'academia': 'Academia',
-        'academia/industry': 'Both',
-        'Industry': 'Industry',
-        'Academia': 'Academia'
-    }
-    df['Sector'] = df['Industry or Academia?'].map(industry_mapping).fillna('Unknown')
-
-    # Identify missing data
-    missing_alumni = identify_missing_data(df)
-
-    # Create peer comparison
-    comp_df = create_peer_comparison_analysis()
-
-    # Calculate economic impact
-    economic_impact = calculate_economic_impact()
-
-    # Create timeline analysis
-    create_timeline_analysis(df)
-
-    # Generate missing data report
-    missing_report = generate_missing_data_report(missing_alumni)
-
-    # Save missing data report
-    with open('missing_data_research.txt', 'w') as f:
-        f.write(missing_report)
-
-    # Generate comprehensive final report
+def generate_comprehensive_report(comp_df, economic_impact, missing_alumni):
+    """Generate the comprehensive impact report text."""
     final_report = f"""
 SPARKLAB IMPACT ANALYSIS: COMPREHENSIVE REPORT
 =============================================
@@ -513,6 +529,53 @@ of this program model.
 Data Completeness: {(149-len(missing_alumni))/149*100:.1f}% (Research ongoing for remaining {len(missing_alumni)} entries)
 """
 
+    return final_report
+
+def main():
+    """Main enhanced analysis function."""
+    print("Running enhanced SparkLab analysis...")
+
+    # Load data
+    df = pd.read_csv('SparkLabAlumni.csv')
+    df.columns = [col.strip() for col in df.columns]
+    df = df.dropna(how='all')
+
+    # Clean sector data
+    industry_mapping = {
+        'industry': 'Industry',
+        'academia': 'Academia',
+        'academia/industry': 'Both',
+        'Industry': 'Industry',
+        'Academia': 'Academia'
+    }
+    df['Sector'] = df['Industry or Academia?'].map(industry_mapping).fillna('Unknown')
+
+    # Identify missing data
+    missing_alumni = identify_missing_data(df)
+
+    # Create peer comparison
+    comp_df = create_peer_comparison_analysis()
+
+    # Calculate economic impact
+    economic_impact = calculate_economic_impact()
+
+    # Create timeline analysis
+    create_timeline_analysis(df)
+
+    # Export timeline series for client-side rendering
+    from chart_data import build_timeline_series, export_chart_data
+    export_chart_data(build_timeline_series(df), 'sparklab_timeline_data.json')
+
+    # Generate missing data report
+    missing_report = generate_missing_data_report(missing_alumni)
+
+    # Save missing data report
+    with open('missing_data_research.txt', 'w') as f:
+        f.write(missing_report)
+
+    # Generate comprehensive final report
+    final_report = generate_comprehensive_report(comp_df, economic_impact, missing_alumni)
+
     # Save final report
     with open('sparklab_comprehensive_report.txt', 'w') as f:
         f.write(final_report)
@@ -521,6 +584,7 @@ Data Completeness: {(149-len(missing_alumni))/149*100:.1f}% (Research ongoing fo
     print("Generated files:")
     print("- sparklab_peer_comparison.png")
     print("- sparklab_timeline_analysis.png")
+    print("- sparklab_timeline_data.json")
     print("- missing_data_research.txt")
     print("- sparklab_comprehensive_report.txt")
 
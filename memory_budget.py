@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Process Memory Budget
+=====================
+
+Helpers for reading the resident set size of the current process, enforcing
+a user-set memory ceiling during long-running analysis, and attributing peak
+usage to the pipeline stages that caused it.
+"""
+
+import os
+import resource
+import sys
+import threading
+from typing import Optional
+
+class MemoryBudgetExceeded(MemoryError):
+    """Raised when the process grows past its configured memory ceiling."""
+
+def current_rss_bytes() -> int:
+    """Current resident set size of this process, in bytes."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return peak_rss_bytes()
+
+def peak_rss_bytes() -> int:
+    """High-water resident set size of this process, in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def parse_size(value) -> Optional[int]:
+    """Parse sizes such as 8000000, '512MB' or '8GB' into bytes."""
+    if value is None or isinstance(value, int):
+        return value
+    units = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30, 'T': 1 << 40}
+    text = str(value).strip().upper().rstrip('B').rstrip('I')
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(float(text))
+
+class MemoryBudget:
+    """Check the process RSS against a ceiling at well-defined points."""
+
+    def __init__(self, limit_bytes=None):
+        self.limit_bytes = parse_size(limit_bytes)
+        self.high_water = 0
+
+    def headroom(self) -> Optional[int]:
+        """Bytes left before the ceiling, or None if unlimited."""
+        if self.limit_bytes is None:
+            return None
+        return max(self.limit_bytes - current_rss_bytes(), 0)
+
+    def check(self, where: str = ''):
+        """Record the current RSS and raise if it is above the ceiling."""
+        rss = current_rss_bytes()
+        self.high_water = max(self.high_water, rss)
+        if self.limit_bytes is not None and rss > self.limit_bytes:
+            raise MemoryBudgetExceeded(
+                f"RSS {rss / (1 << 20):.0f} MB exceeds the {self.limit_bytes / (1 << 20):.0f} MB budget"
+                + (f" at {where}" if where else ''))
+        return rss
+
+class StageMemoryMonitor:
+    """Sample RSS in the background and attribute it to the stages running.
+
+    RSS is per process, so while stages overlap each sample is charged to
+    every stage that is active; the report names the stages that were
+    running when the process hit its high-water mark. Samples above the
+    budget are recorded and raised by check() at the next stage boundary.
+    """
+
+    def __init__(self, budget: MemoryBudget, interval: float = 0.005):
+        self.budget = budget
+        self.interval = interval
+        self.active = {}
+        self.stages = {}
+        self.high_water_stages = []
+        self.exceeded = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self) -> 'StageMemoryMonitor':
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample_loop, name='rss-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> int:
+        """Take one RSS reading and charge it to the active stages."""
+        rss = current_rss_bytes()
+        with self._lock:
+            if rss > self.budget.high_water:
+                self.budget.high_water = rss
+                self.high_water_stages = list(self.active)
+            for name in self.active:
+                self.stages[name]['peak'] = max(self.stages[name]['peak'], rss)
+            if self.budget.limit_bytes is not None and rss > self.budget.limit_bytes and self.exceeded is None:
+                self.exceeded = (rss, list(self.active))
+        return rss
+
+    def stage_started(self, name: str):
+        rss = current_rss_bytes()
+        with self._lock:
+            self.active[name] = True
+            self.stages[name] = {'start': rss, 'peak': rss, 'end': None}
+
+    def stage_finished(self, name: str):
+        self.sample()
+        with self._lock:
+            self.active.pop(name, None)
+            self.stages[name]['end'] = current_rss_bytes()
+
+    def check(self):
+        """Raise MemoryBudgetExceeded if any sample went over the budget."""
+        if self.exceeded is not None:
+            rss, stages = self.exceeded
+            raise MemoryBudgetExceeded(
+                f"RSS {rss / (1 << 20):.0f} MB exceeded the {self.budget.limit_bytes / (1 << 20):.0f} MB budget"
+                f" while running: {', '.join(stages) or 'between stages'}")
+
+    def report(self) -> str:
+        """Per-stage RSS table and the stages active at the high-water mark."""
+        mb = 1 << 20
+        lines = [f"{'stage':22s} {'start MB':>9s} {'peak MB':>9s} {'growth MB':>10s}"]
+        for name, usage in self.stages.items():
+            lines.append(f"{name:22s} {usage['start'] / mb:9.1f} {usage['peak'] / mb:9.1f}"
+                         f" {(usage['peak'] - usage['start']) / mb:10.1f}")
+        lines.append(f"High-water RSS: {self.budget.high_water / mb:.1f} MB"
+                     f" during {', '.join(self.high_water_stages) or 'no stage'}"
+                     f" (process peak {peak_rss_bytes() / mb:.1f} MB)")
+        if self.budget.limit_bytes is not None:
+            lines.append(f"Budget: {self.budget.limit_bytes / mb:.1f} MB")
+        return '\n'.join(lines)
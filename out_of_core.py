@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+SparkLab Out-of-Core Analysis
+=============================
+
+Runs the impact metrics and timeline aggregates over rosters too large to hold
+in one DataFrame. The CSV (or a partitioned Parquet dataset) is read in bounded
+chunks, every chunk is reduced to mergeable partial aggregates, and the merged
+partials are turned back into exactly the structures produced by
+calculate_impact_metrics and compute_timeline_aggregates.
+"""
+
+import glob
+import os
+from collections import Counter
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from sparklab_analysis import (INDUSTRY_MAPPING, LEADERSHIP_ROLES, clean_data,
+                               categorize_positions, match_notable_organization)
+from enhanced_analysis import fit_leadership_trend, prepare_timeline_data
+from memory_budget import MemoryBudget, MemoryBudgetExceeded
+from affiliation_sketch import SpaceSaving
+
+# Working-set multiplier over a chunk's raw DataFrame size (copies, role lists, groupbys)
+CHUNK_OVERHEAD = 6
+MIN_CHUNKSIZE = 1000
+DEFAULT_CHUNKSIZE = 100000
+
+def _counter_series(counter: Counter, name: str) -> pd.Series:
+    """Turn a first-seen-ordered Counter into a value_counts-style Series."""
+    series = pd.Series(dict(counter), dtype='int64', name='count')
+    series.index.name = name
+    return series.sort_values(ascending=False, kind='stable')
+
+def _pair_series(counter: Counter, names) -> pd.Series:
+    """Counts keyed by (year, label) pairs as a two-level Series, even when empty."""
+    index = pd.MultiIndex.from_tuples(list(counter), names=names)
+    return pd.Series(list(counter.values()), index=index, dtype='int64').sort_index()
+
+class PartialMetrics:
+    """Mergeable partial aggregates for every reported metric."""
+
+    def __init__(self, sketch_capacity: Optional[int] = None):
+        self.sketch_capacity = sketch_capacity
+        self.total = 0
+        self.sectors = Counter()
+        self.types = Counter()
+        self.roles = Counter()
+        self.role_holders = Counter()
+        self.current_affiliations = self._affiliation_counter()
+        self.past_affiliations = self._affiliation_counter()
+        self.year_type = Counter()
+        self.year_sector = Counter()
+        self.leadership_sum = Counter()
+        self.leadership_count = Counter()
+
+    def _affiliation_counter(self):
+        """Exact Counter, or a SpaceSaving sketch in bounded-memory mode."""
+        return Counter() if self.sketch_capacity is None else SpaceSaving(self.sketch_capacity)
+
+    def update(self, chunk: pd.DataFrame):
+        """Fold one categorized chunk into the partials."""
+        self.total += len(chunk)
+
+        sector = chunk['Industry or Academia?'].map(INDUSTRY_MAPPING).fillna('Unknown')
+        self.sectors.update(sector.value_counts(sort=False).to_dict())
+        self.types.update(chunk['Type'].value_counts(sort=False).to_dict())
+
+        for roles in chunk['Leadership_Roles']:
+            self.roles.update(roles)
+        for role in LEADERSHIP_ROLES:
+            self.role_holders[role] += sum(1 for roles in chunk['Leadership_Roles'] if role in roles)
+
+        self._update_affiliations(self.current_affiliations, chunk['Company/University 1'])
+        if 'Company/University 2' in chunk.columns:
+            self._update_affiliations(self.past_affiliations, chunk['Company/University 2'].dropna())
+
+        timeline = prepare_timeline_data(chunk)
+        self.year_type.update(timeline.groupby(['Year', 'Type']).size().to_dict())
+        self.year_sector.update(timeline.groupby(['Year', 'Sector_Clean']).size().to_dict())
+        leadership = timeline.groupby('Year')['Has_Leadership'].agg(['sum', 'count'])
+        self.leadership_sum.update(leadership['sum'].to_dict())
+        self.leadership_count.update(leadership['count'].to_dict())
+
+    @staticmethod
+    def _update_affiliations(counter: Counter, companies: pd.Series):
+        """Count notable matches, matching each distinct name once per chunk."""
+        for company, count in companies.value_counts(sort=False).items():
+            notable = match_notable_organization(company)
+            if notable is None:
+                continue
+            if isinstance(counter, SpaceSaving):
+                counter.update(notable, count)
+            else:
+                counter[notable] += count
+
+    def merge(self, other: 'PartialMetrics') -> 'PartialMetrics':
+        """Fold another partial (from a later chunk or worker) into this one."""
+        self.total += other.total
+        for name in ['sectors', 'types', 'roles', 'role_holders', 'year_type', 'year_sector',
+                     'leadership_sum', 'leadership_count']:
+            getattr(self, name).update(getattr(other, name))
+        for name in ['current_affiliations', 'past_affiliations']:
+            mine = getattr(self, name)
+            if isinstance(mine, SpaceSaving):
+                mine.merge(getattr(other, name))
+            else:
+                mine.update(getattr(other, name))
+        return self
+
+    def notable_affiliations(self) -> Counter:
+        """Affiliation counts, current organizations first as in identify_notable_companies."""
+        if self.sketch_capacity is not None:
+            sketch = SpaceSaving(self.sketch_capacity).merge(self.current_affiliations)
+            return sketch.merge(self.past_affiliations)
+
+        affiliations = Counter(self.current_affiliations)
+        affiliations.update(self.past_affiliations)
+        return affiliations
+
+    def impact_metrics(self) -> Dict:
+        """Build the dict calculate_impact_metrics returns."""
+        sector_dist = _counter_series(self.sectors, 'Sector')
+        return {
+            'total_alumni': self.total,
+            'sector_distribution': {
+                'distribution': sector_dist,
+                'percentages': (sector_dist / self.total * 100).round(1)
+            },
+            'leadership_positions': {
+                'all_roles': Counter(self.roles),
+                'ceo_founders': self.role_holders['CEO/Founder'],
+                'ctos': self.role_holders['CTO'],
+                'faculty': self.role_holders['Faculty'],
+                'senior_leadership': self.role_holders['Senior Leadership']
+            },
+            'notable_affiliations': self.notable_affiliations(),
+            'alumni_types': _counter_series(self.types, 'Type')
+        }
+
+    def timeline_aggregates(self) -> Dict:
+        """Build the dict compute_timeline_aggregates returns."""
+        year_type_analysis = _pair_series(self.year_type, ['Year', 'Type']).unstack(fill_value=0)
+        for col in ['Graduate Student', 'PhD Granted', 'Postdoctoral Scholar']:
+            if col not in year_type_analysis.columns:
+                year_type_analysis[col] = 0
+
+        year_sector_analysis = _pair_series(self.year_sector, ['Year', 'Sector_Clean']).unstack(fill_value=0)
+        year_sector_pct = year_sector_analysis.div(year_sector_analysis.sum(axis=1), axis=0) * 100
+
+        leadership_by_year = pd.DataFrame({
+            'sum': pd.Series(self.leadership_sum, dtype='int64'),
+            'count': pd.Series(self.leadership_count, dtype='int64')
+        }).sort_index()
+        leadership_by_year.index.name = 'Year'
+        leadership_by_year['Leadership_Rate'] = (leadership_by_year['sum'] / leadership_by_year['count']) * 100
+
+        return {
+            'year_type': year_type_analysis,
+            'year_sector_pct': year_sector_pct,
+            'leadership_by_year': leadership_by_year,
+            'leadership_trend': fit_leadership_trend(leadership_by_year)
+        }
+
+def estimate_chunksize(filepath: str, budget: MemoryBudget, sample_rows: int = 1000) -> int:
+    """Pick a chunk size whose working set fits in the remaining budget."""
+    headroom = budget.headroom()
+    if headroom is None:
+        return DEFAULT_CHUNKSIZE
+
+    sample = pd.read_csv(filepath, nrows=sample_rows)
+    bytes_per_row = sample.memory_usage(deep=True).sum() / max(len(sample), 1)
+    chunksize = int(headroom / (bytes_per_row * CHUNK_OVERHEAD))
+    if chunksize < MIN_CHUNKSIZE:
+        raise MemoryBudgetExceeded(f"Memory budget leaves room for only {chunksize} rows per chunk")
+    return chunksize
+
+def iter_roster_chunks(path: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    """Yield raw roster chunks from a CSV file or a directory of Parquet partitions."""
+    if os.path.isdir(path) or path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        files = sorted(glob.glob(os.path.join(path, '**', '*.parquet'), recursive=True)) \
+            if os.path.isdir(path) else [path]
+        for filepath in files:
+            for batch in pq.ParquetFile(filepath).iter_batches(batch_size=chunksize):
+                yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+def analyze_out_of_core(path: str, memory_limit=None, chunksize: Optional[int] = None,
+                        cache=None, sketch_capacity: Optional[int] = None) -> Dict:
+    """Compute impact metrics and timeline aggregates in bounded-memory chunks."""
+    budget = MemoryBudget(memory_limit)
+    if chunksize is None:
+        is_parquet = os.path.isdir(path) or path.endswith('.parquet')
+        chunksize = DEFAULT_CHUNKSIZE if is_parquet else estimate_chunksize(path, budget)
+
+    partials = PartialMetrics(sketch_capacity)
+    for i, raw_chunk in enumerate(iter_roster_chunks(path, chunksize)):
+        chunk = categorize_positions(clean_data(raw_chunk), cache=cache)
+        partials.update(chunk)
+        del raw_chunk, chunk
+        budget.check(f"chunk {i}")
+
+    return {
+        'metrics': partials.impact_metrics(),
+        'timeline': partials.timeline_aggregates(),
+        'peak_rss_bytes': budget.high_water,
+        'chunksize': chunksize
+    }
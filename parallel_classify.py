@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Parallel Shared-Memory Classification
+=====================================
+
+Multi-core versions of categorize_positions and identify_notable_companies.
+String columns are dictionary-encoded, and the distinct values are packed into
+one UTF-8 buffer plus an offsets array in shared memory. Workers in a process
+pool attach to those buffers by name, classify their slice of the distinct
+values, and write role bitmasks or organization ids straight into preallocated
+shared output arrays. No DataFrame is pickled and the roster is never copied
+per worker.
+"""
+
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from sparklab_analysis import (NOTABLE_ORGANIZATIONS, ROLE_MASK_DTYPE, classify_position,
+                               match_notable_organization)
+from classification_cache import normalize_title
+from career_history import mask_to_roles, roles_to_mask
+
+PAIR_SEPARATOR = '\x1f'
+TASKS_PER_WORKER = 4
+
+class SharedStrings:
+    """Distinct strings packed into shared memory as UTF-8 bytes plus offsets."""
+
+    def __init__(self, values: Sequence[str]):
+        encoded = [value.encode('utf-8') for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+
+        self.count = len(encoded)
+        self._data = shared_memory.SharedMemory(create=True, size=max(int(offsets[-1]), 1))
+        self._offsets = shared_memory.SharedMemory(create=True, size=offsets.nbytes)
+        self._data.buf[:offsets[-1]] = b''.join(encoded)
+        np.ndarray(offsets.shape, dtype=np.int64, buffer=self._offsets.buf)[:] = offsets
+
+    @property
+    def handle(self) -> Tuple[str, str, int]:
+        """Picklable reference that workers use to attach."""
+        return self._data.name, self._offsets.name, self.count
+
+    def release(self):
+        for block in (self._data, self._offsets):
+            block.close()
+            block.unlink()
+
+class SharedOutput:
+    """A preallocated numpy array in shared memory."""
+
+    def __init__(self, length: int, dtype):
+        self.dtype = np.dtype(dtype)
+        self.length = length
+        self._block = shared_memory.SharedMemory(create=True, size=max(length * self.dtype.itemsize, 1))
+        self.array = np.ndarray((length,), dtype=self.dtype, buffer=self._block.buf)
+
+    @property
+    def handle(self) -> Tuple[str, str, int]:
+        return self._block.name, self.dtype.str, self.length
+
+    def release(self) -> np.ndarray:
+        """Copy the results out and free the shared block."""
+        result = self.array.copy()
+        del self.array
+        self._block.close()
+        self._block.unlink()
+        return result
+
+def _attach_strings(handle, start: int, end: int) -> Tuple[list, List[shared_memory.SharedMemory]]:
+    """Decode strings [start, end) from a SharedStrings handle."""
+    data_name, offsets_name, count = handle
+    data = shared_memory.SharedMemory(name=data_name)
+    offsets_block = shared_memory.SharedMemory(name=offsets_name)
+    offsets = np.ndarray((count + 1,), dtype=np.int64, buffer=offsets_block.buf)
+    values = [bytes(data.buf[offsets[i]:offsets[i + 1]]).decode('utf-8') for i in range(start, end)]
+    del offsets
+    return values, [data, offsets_block]
+
+def _attach_output(handle) -> Tuple[np.ndarray, shared_memory.SharedMemory]:
+    name, dtype, length = handle
+    block = shared_memory.SharedMemory(name=name)
+    return np.ndarray((length,), dtype=np.dtype(dtype), buffer=block.buf), block
+
+def _classify_worker(strings_handle, output_handle, start: int, end: int):
+    """Write role bitmasks for distinct position pairs [start, end)."""
+    pairs, blocks = _attach_strings(strings_handle, start, end)
+    output, output_block = _attach_output(output_handle)
+    for i, pair in enumerate(pairs, start):
+        position1, position2 = pair.split(PAIR_SEPARATOR)
+        output[i] = roles_to_mask(classify_position(position1, position2))
+    del output
+    for block in blocks + [output_block]:
+        block.close()
+
+def _affiliation_worker(strings_handle, output_handle, start: int, end: int):
+    """Write NOTABLE_ORGANIZATIONS ids (-1 for none) for distinct names [start, end)."""
+    names, blocks = _attach_strings(strings_handle, start, end)
+    output, output_block = _attach_output(output_handle)
+    org_ids = {org: i for i, org in enumerate(NOTABLE_ORGANIZATIONS)}
+    for i, name in enumerate(names, start):
+        notable = match_notable_organization(name)
+        output[i] = org_ids[notable] if notable is not None else -1
+    del output
+    for block in blocks + [output_block]:
+        block.close()
+
+def _run_partitioned(worker, values: Sequence[str], dtype, workers: Optional[int]) -> np.ndarray:
+    """Share values, split them across a process pool and collect the output array."""
+    workers = workers or os.cpu_count() or 1
+    strings = SharedStrings(values)
+    output = SharedOutput(len(values), dtype)
+    try:
+        bounds = np.linspace(0, len(values), min(workers * TASKS_PER_WORKER, max(len(values), 1)) + 1).astype(int)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(worker, strings.handle, output.handle, int(lo), int(hi))
+                       for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
+            for future in futures:
+                future.result()
+        return output.release()
+    except BaseException:
+        output.release()
+        raise
+    finally:
+        strings.release()
+
+def categorize_positions_parallel(df: pd.DataFrame, workers: Optional[int] = None) -> pd.DataFrame:
+    """categorize_positions with distinct title pairs classified across processes."""
+    df = df.copy(deep=False)
+    position2 = df['Position 2 or Past Position'] if 'Position 2 or Past Position' in df.columns \
+        else pd.Series(None, index=df.index)
+
+    # Normalize distinct titles only, then pair them up by integer code; the
+    # parent does no per-row Python work before handing off to the pool
+    title_codes = []
+    titles = []
+    for column in (df['Position 1'], position2):
+        raw_codes, raw_titles = pd.factorize(column, use_na_sentinel=False)
+        normalized_codes, normalized = pd.factorize(pd.Series([normalize_title(t) for t in raw_titles],
+                                                              dtype=object))
+        title_codes.append(normalized_codes[raw_codes])
+        titles.append(normalized)
+    codes, pair_keys = pd.factorize(title_codes[0].astype(np.int64) * max(len(titles[1]), 1) + title_codes[1])
+    first, second = np.divmod(pair_keys, max(len(titles[1]), 1))
+    pairs = [titles[0][a] + PAIR_SEPARATOR + titles[1][b] for a, b in zip(first, second)]
+    masks = _run_partitioned(_classify_worker, pairs, ROLE_MASK_DTYPE, workers)
+
+    role_lists = np.empty(len(masks), dtype=object)
+    role_lists[:] = [mask_to_roles(mask) for mask in masks]
+    df['Leadership_Roles'] = role_lists[codes] if len(codes) else []
+    return df
+
+def identify_notable_companies_parallel(df: pd.DataFrame, workers: Optional[int] = None) -> Counter:
+    """identify_notable_companies with distinct names matched across processes."""
+    companies = df['Company/University 1']
+    if 'Company/University 2' in df.columns:
+        companies = pd.concat([companies, df['Company/University 2'].dropna()], ignore_index=True)
+
+    codes, names = pd.factorize(companies)
+    names = pd.Series(names, dtype=object)
+    is_text = names.map(lambda name: isinstance(name, str)).to_numpy(dtype=bool)
+
+    ids = np.full(len(names), -1, dtype=np.int16)
+    ids[is_text] = _run_partitioned(_affiliation_worker, list(names[is_text]), np.int16, workers)
+
+    row_ids = ids[codes[codes >= 0]]
+    row_ids = row_ids[row_ids >= 0]
+    counts = np.bincount(row_ids, minlength=len(NOTABLE_ORGANIZATIONS))
+    return Counter({NOTABLE_ORGANIZATIONS[org_id]: int(counts[org_id]) for org_id in pd.unique(row_ids)})
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+SparkLab Analysis Pipeline
+==========================
+
+The analysis declared as a DAG of stages with explicit inputs and outputs.
+The scheduler runs only the stages a requested target needs, skips targets
+whose output files are newer than the roster, the code and every upstream
+output, and runs independent stages concurrently. A stage that does run gets
+its inputs recomputed, since it consumes their in-memory results. Figure stages run in worker
+processes because matplotlib is not thread-safe; the rest run on threads.
+
+Usage:
+    python pipeline.py                  # every output
+    python pipeline.py report           # just the impact report and its inputs
+    python pipeline.py --list           # show stages and whether they are fresh
+    python pipeline.py --force figures  # rebuild even if fresh
+    python pipeline.py --roster other.csv  # analyze another roster file
+"""
+
+import argparse
+import contextlib
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Sequence, Set
+
+import pandas as pd
+
+from classification_rules import DEFAULT_RULES_PATH
+from memory_budget import MemoryBudget, StageMemoryMonitor
+
+ROSTER = 'SparkLabAlumni.csv'
+
+class Stage:
+    """One step of the pipeline: a function of its input stages' results.
+
+    A stage that reads_roster depends on the roster file and is passed its path
+    as the roster keyword argument.
+    """
+
+    def __init__(self, name: str, func: Callable, inputs: Sequence[str] = (),
+                 outputs: Sequence[str] = (), executor: str = 'thread', code: Sequence[str] = (),
+                 reads_roster: bool = False):
+        if executor not in ('thread', 'process'):
+            raise ValueError(f"Unknown executor for stage {name}: {executor}")
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.executor = executor
+        self.code = list(code)
+        self.reads_roster = reads_roster
+
+    def __repr__(self) -> str:
+        return f"Stage({self.name!r}, inputs={self.inputs}, outputs={self.outputs})"
+
+class Pipeline:
+    """A DAG of stages with freshness checks and a concurrent scheduler."""
+
+    def __init__(self, stages: Sequence[Stage], roster: str = ROSTER):
+        self.stages = {stage.name: stage for stage in stages}
+        self.roster = roster
+        for stage in stages:
+            unknown = [name for name in stage.inputs if name not in self.stages]
+            if unknown:
+                raise ValueError(f"Stage {stage.name} depends on unknown stages: {unknown}")
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        order, state = [], {}
+
+        def visit(name):
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'visiting':
+                raise ValueError(f"Pipeline has a cycle through stage {name}")
+            state[name] = 'visiting'
+            for dependency in self.stages[name].inputs:
+                visit(dependency)
+            state[name] = 'done'
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def ancestors(self, name: str) -> Set[str]:
+        """Every stage the named stage depends on, directly or not."""
+        seen, stack = set(), list(self.stages[name].inputs)
+        while stack:
+            dependency = stack.pop()
+            if dependency not in seen:
+                seen.add(dependency)
+                stack.extend(self.stages[dependency].inputs)
+        return seen
+
+    def _input_mtime(self, name: str) -> float:
+        """Newest modification time among everything the stage's outputs derive from."""
+        lineage = [self.stages[name]] + [self.stages[n] for n in self.ancestors(name)]
+        paths = {path for stage in lineage for path in stage.code} | {__file__}
+        paths |= {output for stage in lineage[1:] for output in stage.outputs}
+        if any(stage.reads_roster for stage in lineage):
+            paths.add(self.roster)
+        return max((os.path.getmtime(path) for path in paths if path and os.path.exists(path)), default=0.0)
+
+    def is_fresh(self, name: str) -> bool:
+        """True if the stage has outputs and all are newer than its inputs."""
+        outputs = self.stages[name].outputs
+        if not outputs or not all(os.path.exists(path) for path in outputs):
+            return False
+        return min(os.path.getmtime(path) for path in outputs) >= self._input_mtime(name)
+
+    def targets(self) -> List[str]:
+        """Stages no other stage depends on: the default build."""
+        used = {dependency for stage in self.stages.values() for dependency in stage.inputs}
+        return [name for name in self.order if name not in used]
+
+    def plan(self, targets: Optional[Sequence[str]] = None, force: bool = False) -> List[str]:
+        """Stages that must run for the targets, in topological order.
+
+        Only the targets themselves may be skipped as fresh: a scheduled stage
+        is passed its inputs' return values, so those always run with it.
+        """
+        targets = list(targets) if targets else self.targets()
+        unknown = [name for name in targets if name not in self.stages]
+        if unknown:
+            raise ValueError(f"Unknown pipeline targets: {unknown}")
+
+        needed: Set[str] = set()
+
+        def require(name, consumed: bool = False):
+            if name in needed or (not consumed and not force and self.is_fresh(name)):
+                return
+            needed.add(name)
+            for dependency in self.stages[name].inputs:
+                require(dependency, consumed=True)
+
+        for name in targets:
+            require(name)
+        return [name for name in self.order if name in needed]
+
+    def run(self, targets: Optional[Sequence[str]] = None, force: bool = False,
+            workers: Optional[int] = None, on_stage: Optional[Callable[[str, float], None]] = None,
+            copy_free: bool = False, memory_limit=None) -> Dict:
+        """Run the planned stages, independent ones concurrently; returns stage results.
+
+        In copy-free mode pandas copy-on-write is switched on, so frames pass
+        between stages as lazy views, and figure stages run in this process
+        one at a time instead of unpickling a copy of the roster in a worker.
+        memory_limit (bytes or '2GB') is a peak RSS budget for this process;
+        the per-stage usage is left in self.memory for report().
+        """
+        pending = self.plan(targets, force)
+        results: Dict[str, object] = {}
+        workers = workers or min(8, os.cpu_count() or 1)
+        figure_stages = any(self.stages[name].executor == 'process' for name in pending)
+        needs_processes = figure_stages and not copy_free
+        if figure_stages and copy_free:
+            # Figure stages draw in this process, so they must not open windows
+            _use_agg_backend()
+        self.memory = StageMemoryMonitor(MemoryBudget(memory_limit))
+
+        with _copy_on_write(copy_free), self.memory, ThreadPoolExecutor(max_workers=workers) as threads, \
+                _process_pool(workers if needs_processes else 0) as processes:
+            running = {}
+            started = {}
+            while pending or running:
+                for name in [n for n in pending if all(d in results for d in self.stages[n].inputs)]:
+                    stage = self.stages[name]
+                    args = [results[d] for d in stage.inputs]
+                    kwargs = {'roster': self.roster} if stage.reads_roster else {}
+                    self.memory.stage_started(name)
+                    if stage.executor == 'process' and not copy_free:
+                        future = processes.submit(stage.func, *args, **kwargs)
+                    elif stage.executor == 'process':
+                        future = threads.submit(_run_serialized, stage.func, *args, **kwargs)
+                    else:
+                        future = threads.submit(stage.func, *args, **kwargs)
+                    running[future] = name
+                    started[name] = time.perf_counter()
+                    pending.remove(name)
+                if not running:
+                    raise RuntimeError(f"No stage can run; inputs missing for: {pending}")
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    results[name] = future.result()
+                    self.memory.stage_finished(name)
+                    if on_stage is not None:
+                        on_stage(name, time.perf_counter() - started[name])
+                self.memory.check()
+        return results
+
+class _NullPool:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, *args, **kwargs):
+        raise RuntimeError("No process pool was started for this run")
+
+def _process_pool(workers: int):
+    if workers <= 0:
+        return _NullPool()
+    # Forking while the memory sampler and stage threads run can deadlock the
+    # children, so workers start from a clean server process instead
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method),
+                               initializer=_use_agg_backend)
+
+# pyplot keeps global state, so in-process figure stages take turns
+_FIGURE_LOCK = threading.Lock()
+
+def _run_serialized(func: Callable, *args, **kwargs):
+    with _FIGURE_LOCK:
+        return func(*args, **kwargs)
+
+def _copy_on_write(enabled: bool):
+    if not enabled:
+        return contextlib.nullcontext()
+    return pd.option_context('mode.copy_on_write', True)
+
+def _use_agg_backend():
+    """Render figures off-screen, in a worker process or in copy-free mode here."""
+    import matplotlib
+    matplotlib.use('Agg')
+
+# Stage functions. Each takes its input stages' results positionally and writes
+# the files listed as its outputs.
+
+def load_roster(roster: str = ROSTER) -> pd.DataFrame:
+    return pd.read_csv(roster)
+
+def validate(raw_df: pd.DataFrame, roster: str = ROSTER) -> pd.DataFrame:
+    from data_validation import validate_roster
+    errors = validate_roster(raw_df, roster)
+    errors.to_csv('sparklab_validation_errors.csv', index=False)
+    return errors
+
+def clean(raw_df: pd.DataFrame) -> pd.DataFrame:
+    from sparklab_analysis import clean_data
+    return clean_data(raw_df)
+
+def classify(df: pd.DataFrame) -> pd.DataFrame:
+    from sparklab_analysis import categorize_positions
+    return categorize_positions(df)
+
+def metrics(df: pd.DataFrame) -> Dict:
+    from sparklab_analysis import calculate_impact_metrics
+    return calculate_impact_metrics(df)
+
+def impact_figure(df: pd.DataFrame, metrics: Dict):
+    from sparklab_analysis import create_visualizations
+    create_visualizations(df, metrics)
+
+def chart_data(df: pd.DataFrame, metrics: Dict):
+    from chart_data import build_chart_series, export_chart_data
+    export_chart_data(build_chart_series(df, metrics), 'sparklab_chart_data.json')
+
+def impact_report(df: pd.DataFrame, metrics: Dict) -> str:
+    from sparklab_analysis import generate_detailed_report
+    report = generate_detailed_report(df, metrics)
+    with open('sparklab_impact_report.txt', 'w') as f:
+        f.write(report)
+    return report
+
+def timeline(df: pd.DataFrame) -> Dict:
+    from enhanced_analysis import compute_timeline_aggregates, prepare_timeline_data
+    return compute_timeline_aggregates(prepare_timeline_data(df))
+
+def snapshot(metrics: Dict, timeline: Dict, roster: str = ROSTER) -> int:
+    from sparklab_analysis import roster_fingerprint
+    from snapshot_store import SnapshotStore
+    return SnapshotStore('sparklab_snapshots').append(metrics, timeline, input_hash=roster_fingerprint(roster))
+
+def missing_data(raw_df: pd.DataFrame) -> List[Dict]:
+    from enhanced_analysis import generate_missing_data_report, identify_missing_data
+    df = raw_df.copy(deep=False)
+    df.columns = [col.strip() for col in df.columns]
+    missing_alumni = identify_missing_data(df.dropna(how='all'))
+    with open('missing_data_research.txt', 'w') as f:
+        f.write(generate_missing_data_report(missing_alumni))
+    return missing_alumni
+
+def peer_figure():
+    from enhanced_analysis import create_peer_comparison_analysis
+    create_peer_comparison_analysis()
+
+def timeline_figure(df: pd.DataFrame):
+    from enhanced_analysis import create_timeline_analysis
+    create_timeline_analysis(df)
+
+def timeline_data(df: pd.DataFrame):
+    from chart_data import build_timeline_series, export_chart_data
+    export_chart_data(build_timeline_series(df), 'sparklab_timeline_data.json')
+
+def comprehensive_report(missing_alumni: List[Dict]) -> str:
+    from enhanced_analysis import calculate_economic_impact, generate_comprehensive_report, peer_comparison_data
+    report = generate_comprehensive_report(peer_comparison_data(), calculate_economic_impact(), missing_alumni)
+    with open('sparklab_comprehensive_report.txt', 'w') as f:
+        f.write(report)
+    return report
+
+def _module_path(module: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), f"{module}.py")
+
+# Code each stage's outputs depend on, besides this file
+ANALYSIS = _module_path('sparklab_analysis')
+ENHANCED = _module_path('enhanced_analysis')
+CHART_DATA = _module_path('chart_data')
+VALIDATION = _module_path('data_validation')
+RULES = _module_path('classification_rules')
+RULE_FILE = DEFAULT_RULES_PATH
+SURVIVAL = _module_path('cohort_survival')
+CAREERS = _module_path('career_history')
+
+STAGES = [
+    Stage('load', load_roster, reads_roster=True),
+    Stage('validate', validate, ['load'], ['sparklab_validation_errors.csv'],
+          code=[VALIDATION], reads_roster=True),
+    Stage('clean', clean, ['load'], code=[ANALYSIS]),
+    Stage('classify', classify, ['clean'], code=[ANALYSIS, RULES, RULE_FILE]),
+    Stage('metrics', metrics, ['classify'], code=[ANALYSIS]),
+    Stage('impact_figure', impact_figure, ['classify', 'metrics'], ['sparklab_impact_analysis.png'], 'process'),
+    Stage('chart_data', chart_data, ['classify', 'metrics'], ['sparklab_chart_data.json'], code=[CHART_DATA]),
+    Stage('report', impact_report, ['classify', 'metrics'], ['sparklab_impact_report.txt']),
+    Stage('timeline', timeline, ['classify'], code=[ENHANCED]),
+    Stage('snapshot', snapshot, ['metrics', 'timeline'], ['sparklab_snapshots/snapshots.jsonl'],
+          reads_roster=True),
+    Stage('missing_data', missing_data, ['load'], ['missing_data_research.txt'], code=[ENHANCED]),
+    Stage('peer_figure', peer_figure, [], ['sparklab_peer_comparison.png'], 'process', code=[ENHANCED]),
+    Stage('timeline_figure', timeline_figure, ['clean'], ['sparklab_timeline_analysis.png'], 'process',
+          code=[ENHANCED, SURVIVAL, CAREERS, RULES, RULE_FILE]),
+    Stage('timeline_data', timeline_data, ['clean'], ['sparklab_timeline_data.json'],
+          code=[CHART_DATA, ENHANCED, RULES, RULE_FILE]),
+    Stage('comprehensive_report', comprehensive_report, ['missing_data'], ['sparklab_comprehensive_report.txt'],
+          code=[ENHANCED]),
+]
+
+# Named groups of targets accepted on the command line
+TARGET_GROUPS = {
+    'figures': ['impact_figure', 'peer_figure', 'timeline_figure'],
+    'reports': ['report', 'comprehensive_report', 'missing_data'],
+    'sparklab': ['validate', 'impact_figure', 'chart_data', 'report', 'snapshot'],
+    'enhanced': ['peer_figure', 'timeline_figure', 'timeline_data', 'missing_data', 'comprehensive_report'],
+}
+
+def build_pipeline(roster: str = ROSTER) -> Pipeline:
+    """The SparkLab pipeline, by default over the roster in the working directory."""
+    return Pipeline(STAGES, roster)
+
+def main(argv: Optional[Sequence[str]] = None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description='Run the SparkLab analysis pipeline.')
+    parser.add_argument('targets', nargs='*',
+                        help=f"stages or groups to build (groups: {', '.join(TARGET_GROUPS)}); default: all")
+    parser.add_argument('--force', action='store_true', help='rerun stages even if their outputs are fresh')
+    parser.add_argument('--roster', default=ROSTER, help=f'roster CSV to analyze (default: {ROSTER})')
+    parser.add_argument('--classification-cache', default=None,
+                        help='SQLite file that keeps position classifications between runs')
+    parser.add_argument('--workers', type=int, default=None, help='threads/processes to run stages on')
+    parser.add_argument('--list', action='store_true', help='list stages and their freshness, then exit')
+    parser.add_argument('--dry-run', action='store_true', help='print the stages that would run, then exit')
+    parser.add_argument('--copy-free', action='store_true',
+                        help='copy-on-write handoff between stages; figures drawn in-process')
+    parser.add_argument('--memory-budget', default=None,
+                        help="peak RSS budget such as 2GB; prints a per-stage memory report")
+    args = parser.parse_args(argv)
+
+    if args.classification_cache:
+        # Also exported through the environment, so figure worker processes share it
+        from sparklab_analysis import use_persistent_classification_cache
+        use_persistent_classification_cache(args.classification_cache)
+
+    pipeline = build_pipeline(args.roster)
+    targets = [name for target in args.targets for name in TARGET_GROUPS.get(target, [target])]
+
+    if args.list:
+        for name in pipeline.order:
+            stage = pipeline.stages[name]
+            status = 'fresh' if pipeline.is_fresh(name) else ('stale' if stage.outputs else '-')
+            print(f"{name:22s} {status:6s} <- {', '.join(stage.inputs) or '(none)'}")
+        return
+
+    plan = pipeline.plan(targets, args.force)
+    if args.dry_run or not plan:
+        print('Stages to run: ' + (', '.join(plan) if plan else 'none, all outputs are fresh'))
+        return
+
+    print(f"Running {len(plan)} stage(s): {', '.join(plan)}")
+    try:
+        pipeline.run(targets, args.force, args.workers,
+                     on_stage=lambda name, seconds: print(f"  {name} finished in {seconds:.2f}s"),
+                     copy_free=args.copy_free, memory_limit=args.memory_budget)
+    finally:
+        if args.copy_free or args.memory_budget:
+            print(pipeline.memory.report())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+SparkLab Approximate Preview
+============================
+
+A quick directional read of the headline impact metrics on rosters too large
+to analyze end to end in an interactive loop. Rows are stratified by Type x
+Year and sampled without replacement in random order within each stratum. Each
+round grows the sample geometrically, classifies only the newly drawn rows, and
+re-estimates every metric as a stratified mean with a normal confidence
+interval:
+
+    estimate = sum_h W_h * mean_h
+    variance = sum_h W_h^2 * (1 - n_h / N_h) * s_h^2 / n_h
+
+W_h = N_h / N is the stratum weight and (1 - n_h / N_h) the finite-population
+correction, so a fully sampled stratum contributes no error. For the 0/1
+sector and leadership metrics, s_h^2 / n_h is replaced by the Agresti-Coull
+term p_h (1 - p_h) / (n_h + z^2), where p_h = (x_h + z^2 / 2) / (n_h + z^2).
+A stratum whose sampled rows are all 0 still counts as uncertain, so a rare
+role cannot look converged after a handful of rows. Refinement stops as soon
+as every headline metric's half-width is within the requested precision, or
+when max_rows (by default the whole roster) has been read.
+
+Type shares and the total are exact, because they are the strata themselves.
+"""
+
+from statistics import NormalDist
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from sparklab_analysis import (NOTABLE_ORGANIZATIONS, categorize_positions, load_and_clean_data,
+                               map_sectors, match_notable_organization)
+
+SECTORS = ['Industry', 'Academia', 'Both', 'Unknown']
+LEADERSHIP_METRICS = {
+    'ceo_founders': 'CEO/Founder',
+    'ctos': 'CTO',
+    'faculty': 'Faculty',
+    'senior_leadership': 'Senior Leadership',
+}
+HEADLINE_METRICS = [f"sector.{sector}" for sector in SECTORS] + \
+    [f"leadership.{key}" for key in LEADERSHIP_METRICS]
+PROPORTION_PREFIXES = ('sector.', 'leadership.')
+MIN_PER_STRATUM = 2
+
+def _notable_ids(companies: pd.Series) -> np.ndarray:
+    """NOTABLE_ORGANIZATIONS index per row (-1 for none), matching each distinct name once."""
+    codes, uniques = pd.factorize(companies)
+    org_ids = {org: i for i, org in enumerate(NOTABLE_ORGANIZATIONS)}
+    unique_ids = np.array([org_ids.get(match_notable_organization(name), -1) for name in uniques] + [-1])
+    return unique_ids[codes]
+
+def row_indicators(df: pd.DataFrame, cache=None) -> pd.DataFrame:
+    """Per-row values whose stratified means are the impact metrics."""
+    sectors = map_sectors(df)
+    roles = categorize_positions(df, cache)['Leadership_Roles']
+    values = {f"sector.{sector}": (sectors == sector).to_numpy(dtype=float) for sector in SECTORS}
+    for key, role in LEADERSHIP_METRICS.items():
+        values[f"leadership.{key}"] = np.fromiter((role in row for row in roles), dtype=float, count=len(df))
+
+    # Affiliations are per-row counts (current and past can both match)
+    counts = np.zeros((len(df), len(NOTABLE_ORGANIZATIONS)))
+    for column in ['Company/University 1', 'Company/University 2']:
+        if column in df.columns:
+            ids = _notable_ids(df[column])
+            matched = ids >= 0
+            np.add.at(counts, (np.flatnonzero(matched), ids[matched]), 1)
+    for i, org in enumerate(NOTABLE_ORGANIZATIONS):
+        values[f"affiliations.{org}"] = counts[:, i]
+    return pd.DataFrame(values, index=df.index)
+
+def _label(value) -> str:
+    """Stratum label for a Type or Year value, 'Unknown' when missing."""
+    if pd.isna(value):
+        return 'Unknown'
+    return str(int(value)) if isinstance(value, float) else str(value)
+
+class StratifiedPreview:
+    """Progressively refined stratified sample over a roster."""
+
+    def __init__(self, df: pd.DataFrame, seed: int = 0, cache=None):
+        self.df = df
+        self.cache = cache
+        year = pd.to_numeric(df['Year'], errors='coerce')
+        type_codes, types = pd.factorize(df['Type'], use_na_sentinel=False)
+        year_codes, years = pd.factorize(year, use_na_sentinel=False)
+        self.strata, pairs = pd.factorize(type_codes.astype(np.int64) * len(years) + year_codes)
+        self.labels = [(_label(types[pair // len(years)]), _label(years[pair % len(years)])) for pair in pairs]
+        self.sizes = np.bincount(self.strata, minlength=len(self.labels))
+
+        # Walk a random permutation grouped by stratum (a stable radix sort keeps
+        # it random within each one); a sample of n_h rows is a stratum's first n_h
+        shuffled = np.random.default_rng(seed).permutation(len(df))
+        order = shuffled[np.argsort(self.strata[shuffled], kind='stable')]
+        starts = np.concatenate([[0], np.cumsum(self.sizes)[:-1]])
+        self.rank = np.empty(len(df), dtype=np.int64)
+        self.rank[order] = np.arange(len(df)) - np.repeat(starts, self.sizes)
+
+        self.taken = np.zeros(len(self.labels), dtype=np.int64)
+        self.sample_rows = np.zeros(0, dtype=np.int64)
+        self.values = None
+
+    @property
+    def total_rows(self) -> int:
+        return len(self.df)
+
+    def allocation(self, n: int) -> np.ndarray:
+        """Proportional allocation of n rows, with a floor of MIN_PER_STRATUM per stratum."""
+        share = n * self.sizes / max(self.total_rows, 1)
+        target = np.floor(share).astype(np.int64)
+        # Largest remainders take the rows lost to rounding down, so the total reaches n
+        short = int(min(n, self.total_rows) - target.sum())
+        if short > 0:
+            target[np.argsort(target - share, kind='stable')[:short]] += 1
+        return np.clip(np.maximum(target, MIN_PER_STRATUM), 0, self.sizes)
+
+    def refine(self, n: int):
+        """Grow the sample to about n rows, classifying only the new rows."""
+        allocation = np.maximum(self.allocation(n), self.taken)
+        new = np.flatnonzero((self.rank >= self.taken[self.strata]) & (self.rank < allocation[self.strata]))
+        if len(new):
+            values = row_indicators(self.df.iloc[new], self.cache).reset_index(drop=True)
+            self.values = values if self.values is None else pd.concat([self.values, values], ignore_index=True)
+            self.sample_rows = np.concatenate([self.sample_rows, new])
+        self.taken = allocation
+
+    def estimates(self, confidence: float = 0.95) -> pd.DataFrame:
+        """Stratified estimates with finite-population-corrected confidence intervals.
+
+        Proportion bounds are clipped to [0, 1]; half_width is the unclipped one.
+        """
+        codes = self.strata[self.sample_rows]
+        grouped = self.values.groupby(codes)
+        n_h = grouped.size().reindex(range(len(self.labels)), fill_value=0).to_numpy(dtype=float)
+        means = grouped.mean().reindex(range(len(self.labels))).fillna(0.0)
+        variances = grouped.var(ddof=1).reindex(range(len(self.labels))).fillna(0.0).to_numpy()
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+
+        # Agresti-Coull per stratum for 0/1 metrics, scaled so that dividing by n_h
+        # below gives p_h (1 - p_h) / (n_h + z^2)
+        proportion = self.values.columns.str.startswith(PROPORTION_PREFIXES)
+        successes = grouped.sum().reindex(range(len(self.labels))).fillna(0.0).to_numpy()[:, proportion]
+        adjusted = (successes + z ** 2 / 2) / (n_h[:, None] + z ** 2)
+        variances[:, proportion] = adjusted * (1 - adjusted) * n_h[:, None] / (n_h[:, None] + z ** 2)
+
+        weights = self.sizes / self.total_rows
+        fpc = np.where(n_h > 0, 1 - n_h / self.sizes, 0.0)
+        estimate = weights @ means.to_numpy()
+        variance = (weights ** 2 * fpc / np.maximum(n_h, 1)) @ variances
+        half_width = z * np.sqrt(np.maximum(variance, 0.0))
+
+        return pd.DataFrame({
+            'estimate': estimate,
+            'lower': np.where(proportion, np.maximum(estimate - half_width, 0.0), estimate - half_width),
+            'upper': np.where(proportion, np.minimum(estimate + half_width, 1.0), estimate + half_width),
+            'half_width': half_width,
+            'estimated_count': estimate * self.total_rows
+        }, index=pd.Index(self.values.columns, name='metric'))
+
+    def type_distribution(self) -> pd.Series:
+        """Exact alumni counts per Type, from the strata sizes."""
+        types = pd.Series(self.sizes, index=[alumni_type for alumni_type, _ in self.labels])
+        return types.groupby(level=0, sort=False).sum().sort_values(ascending=False, kind='stable')
+
+def preview_impact_metrics(source, precision: float = 0.01, confidence: float = 0.95,
+                           initial_rows: int = 1000, growth: float = 2.0, max_rows: Optional[int] = None,
+                           metrics: Sequence[str] = HEADLINE_METRICS, seed: int = 0, cache=None,
+                           on_round: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """Estimate the impact metrics from a growing stratified sample.
+
+    source is a cleaned roster DataFrame or a roster path. precision is the
+    largest acceptable confidence half-width, as a proportion (0.01 is one
+    percentage point), over the given metrics.
+    """
+    df = load_and_clean_data(source) if isinstance(source, str) else source
+    preview = StratifiedPreview(df, seed, cache)
+    limit = preview.total_rows if max_rows is None else min(max_rows, preview.total_rows)
+
+    n = min(initial_rows, limit)
+    rounds: List[Dict] = []
+    while True:
+        preview.refine(n)
+        table = preview.estimates(confidence)
+        widest = float(table.loc[list(metrics), 'half_width'].max())
+        converged = widest <= precision
+        rounds.append({'round': len(rounds) + 1, 'sample_rows': len(preview.sample_rows),
+                       'max_half_width': widest})
+        if on_round is not None:
+            on_round(rounds[-1])
+        # Once n reaches the limit the next round would draw nothing new
+        if converged or len(preview.sample_rows) >= limit or n >= limit:
+            break
+        n = min(int(np.ceil(n * growth)), limit)
+
+    return {
+        'estimates': table,
+        'alumni_types': preview.type_distribution(),
+        'total_alumni': preview.total_rows,
+        'sample_rows': len(preview.sample_rows),
+        'converged': converged,
+        'confidence': confidence,
+        'rounds': pd.DataFrame(rounds)
+    }
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+SparkLab Full-Text Search Index
+===============================
+
+An inverted index over alumni names, positions and organizations. Each field
+group keeps a sorted vocabulary and CSR postings (document ids with term
+frequencies) in numpy arrays, so a query is a binary search per term followed
+by vectorized BM25 accumulation over the matching postings. Prefix queries
+("data*") expand to the vocabulary range found by bisection.
+
+Rows added after the build go to a small in-memory delta segment and removed
+rows are tombstoned; compact() folds both into the main segment. The index is
+saved next to the roster with the searchable columns stored alongside, so
+queries never reparse the CSV. When the roster changes, sync() adds and removes
+only the rows whose content differs.
+"""
+
+import bisect
+import json
+import os
+import re
+import zipfile
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from sparklab_analysis import roster_cache_path, roster_fingerprint
+
+SEARCH_VERSION = 1
+
+# Field groups searched together; a query term like org:anyscale targets one group
+SEARCH_FIELDS = {
+    'name': ['Name'],
+    'position': ['Position 1', 'Position 2 or Past Position'],
+    'org': ['Company/University 1', 'Company/University 2'],
+}
+STORED_COLUMNS = ['Name', 'Type', 'Year', 'Position 1', 'Company/University 1',
+                  'Position 2 or Past Position', 'Company/University 2']
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+def tokenize(text) -> List[str]:
+    """Lower-cased word tokens of a value; missing values have none."""
+    if not isinstance(text, str):
+        return []
+    return TOKEN_PATTERN.findall(text.casefold())
+
+def _pack_strings(values: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """UTF-8 buffer and int64 offsets for a list of strings."""
+    encoded = [value.encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+def _unpack_strings(buffer: np.ndarray, offsets: np.ndarray) -> List[str]:
+    data = buffer.tobytes()
+    return [data[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(offsets) - 1)]
+
+class _StoredColumn:
+    """A string column held as one UTF-8 buffer plus offsets, decoded only for result rows."""
+
+    def __init__(self, buffer: bytes, offsets: np.ndarray):
+        self.buffer = buffer
+        self.offsets = offsets
+        self.appended: List[str] = []
+
+    @classmethod
+    def from_values(cls, values: Sequence[str]) -> '_StoredColumn':
+        buffer, offsets = _pack_strings(values)
+        return cls(buffer.tobytes(), offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1 + len(self.appended)
+
+    def __getitem__(self, row: int) -> str:
+        base = len(self.offsets) - 1
+        if row >= base:
+            return self.appended[row - base]
+        return self.buffer[self.offsets[row]:self.offsets[row + 1]].decode('utf-8')
+
+    def take(self, rows: Iterable[int]) -> List[str]:
+        return [self[int(row)] for row in rows]
+
+    def extend(self, values: Iterable[str]):
+        self.appended.extend(values)
+
+    def packed(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Buffer and offsets covering appended values too."""
+        if not self.appended:
+            return np.frombuffer(self.buffer, dtype=np.uint8), self.offsets
+        return _pack_strings(self.take(range(len(self))))
+
+def row_keys(df: pd.DataFrame) -> np.ndarray:
+    """Content hash per row; identical rows are told apart by occurrence number."""
+    stored = df.reindex(columns=STORED_COLUMNS).astype(str)
+    occurrence = stored.groupby(STORED_COLUMNS, sort=False, dropna=False).cumcount()
+    return pd.util.hash_pandas_object(stored.assign(_occurrence=occurrence), index=False).to_numpy()
+
+class _FieldIndex:
+    """Postings for one field group: a sorted vocabulary with CSR postings plus a delta segment."""
+
+    def __init__(self, terms: List[str], offsets: np.ndarray, docs: np.ndarray, freqs: np.ndarray,
+                 lengths: np.ndarray):
+        self.terms = terms
+        self.offsets = offsets
+        self.docs = docs
+        self.freqs = freqs
+        self.lengths = lengths
+        self.delta: Dict[str, List[Tuple[int, int]]] = {}
+
+    @classmethod
+    def build(cls, columns: Sequence[pd.Series], n_docs: int) -> '_FieldIndex':
+        """Tokenize each distinct value once and expand the postings to rows."""
+        vocabulary: Dict[str, int] = {}
+        doc_parts, term_parts, freq_parts = [], [], []
+
+        for column in columns:
+            codes, uniques = pd.factorize(column)
+            value_terms, value_freqs, value_sizes = [], [], []
+            for value in uniques:
+                counts: Dict[int, int] = {}
+                for token in tokenize(value):
+                    term_id = vocabulary.setdefault(token, len(vocabulary))
+                    counts[term_id] = counts.get(term_id, 0) + 1
+                value_terms.extend(counts)
+                value_freqs.extend(counts.values())
+                value_sizes.append(len(counts))
+
+            # CSR expansion: row r gets the term slice of its value code
+            value_sizes = np.append(np.asarray(value_sizes, dtype=np.int64), 0)
+            value_starts = np.concatenate([[0], np.cumsum(value_sizes[:-1])])
+            row_sizes = value_sizes[codes]
+            total = int(row_sizes.sum())
+            row_starts = np.repeat(value_starts[codes] - np.cumsum(row_sizes) + row_sizes, row_sizes)
+            slots = row_starts + np.arange(total)
+            doc_parts.append(np.repeat(np.arange(len(codes), dtype=np.int32), row_sizes))
+            term_parts.append(np.asarray(value_terms, dtype=np.int64)[slots])
+            freq_parts.append(np.asarray(value_freqs, dtype=np.int32)[slots])
+
+        terms = sorted(vocabulary)
+        rank = np.empty(len(vocabulary), dtype=np.int64)
+        rank[[vocabulary[term] for term in terms]] = np.arange(len(terms))
+
+        docs = np.concatenate(doc_parts) if doc_parts else np.zeros(0, np.int32)
+        term_ids = rank[np.concatenate(term_parts)] if doc_parts else np.zeros(0, np.int64)
+        freqs = np.concatenate(freq_parts) if doc_parts else np.zeros(0, np.int32)
+
+        # Sort by (term, doc) and merge the same term from both columns of a document
+        order = np.lexsort((docs, term_ids))
+        docs, term_ids, freqs = docs[order], term_ids[order], freqs[order]
+        first = np.concatenate([[True], (docs[1:] != docs[:-1]) | (term_ids[1:] != term_ids[:-1])]) \
+            if len(docs) else np.zeros(0, bool)
+        starts = np.flatnonzero(first)
+        freqs = np.add.reduceat(freqs, starts).astype(np.int32) if len(starts) else freqs
+        docs, term_ids = docs[starts], term_ids[starts]
+
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_ids, minlength=len(terms)), out=offsets[1:])
+        lengths = np.bincount(docs, weights=freqs, minlength=n_docs).astype(np.float32)
+        return cls(terms, offsets, docs, freqs, lengths)
+
+    def add(self, doc: int, texts: Iterable) -> float:
+        """Index one new document into the delta segment; returns its field length."""
+        counts: Dict[str, int] = {}
+        for text in texts:
+            for token in tokenize(text):
+                counts[token] = counts.get(token, 0) + 1
+        for token, count in counts.items():
+            self.delta.setdefault(token, []).append((doc, count))
+        return float(sum(counts.values()))
+
+    def expand(self, term: str, prefix: bool) -> List[str]:
+        """Vocabulary terms equal to term, or starting with it for prefix queries."""
+        lo = bisect.bisect_left(self.terms, term)
+        if not prefix:
+            in_main = lo < len(self.terms) and self.terms[lo] == term
+            return [term] if in_main or term in self.delta else []
+        hi = bisect.bisect_left(self.terms, term + '\U0010ffff')
+        expanded = self.terms[lo:hi]
+        seen = set(expanded)
+        return expanded + sorted(t for t in self.delta if t.startswith(term) and t not in seen)
+
+    def postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Document ids and term frequencies for one term across both segments."""
+        i = bisect.bisect_left(self.terms, term)
+        if i < len(self.terms) and self.terms[i] == term:
+            docs, freqs = self.docs[self.offsets[i]:self.offsets[i + 1]], self.freqs[self.offsets[i]:self.offsets[i + 1]]
+        else:
+            docs, freqs = np.zeros(0, np.int32), np.zeros(0, np.int32)
+        if term in self.delta:
+            extra = np.asarray(self.delta[term], dtype=np.int64).reshape(-1, 2)
+            docs = np.concatenate([docs, extra[:, 0].astype(np.int32)])
+            freqs = np.concatenate([freqs, extra[:, 1].astype(np.int32)])
+        return docs, freqs
+
+class SearchIndex:
+    """BM25 full-text index over the roster's name, position and organization fields."""
+
+    def __init__(self, fields: Dict[str, _FieldIndex], stored: Dict[str, _StoredColumn], keys: np.ndarray,
+                 alive: np.ndarray, fingerprint: Optional[str] = None):
+        self.fields = fields
+        self.stored = stored
+        self.keys = keys
+        self.alive = alive
+        self.fingerprint = fingerprint
+        self._statistics = None
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, fingerprint: Optional[str] = None) -> 'SearchIndex':
+        """Index every row of a roster."""
+        df = df.reset_index(drop=True)
+        fields = {}
+        for field, columns in SEARCH_FIELDS.items():
+            present = [df[col] for col in columns if col in df.columns]
+            fields[field] = _FieldIndex.build(present, len(df))
+        stored = {col: _StoredColumn.from_values(cls._stored_values(df, col)) for col in STORED_COLUMNS}
+        return cls(fields, stored, row_keys(df), np.ones(len(df), dtype=bool), fingerprint)
+
+    @staticmethod
+    def _stored_values(df: pd.DataFrame, column: str) -> List[str]:
+        if column not in df.columns:
+            return [''] * len(df)
+        return df[column].astype(object).where(df[column].notna(), '').astype(str).tolist()
+
+    def __len__(self) -> int:
+        return self._corpus_statistics()[0]
+
+    def _corpus_statistics(self) -> Tuple[int, Dict[str, float]]:
+        """Live document count and average field lengths, cached until the next change."""
+        if self._statistics is None:
+            n_live = int(self.alive.sum())
+            average_lengths = {field: max(float(index.lengths[self.alive].mean()), 1.0) if n_live else 1.0
+                               for field, index in self.fields.items()}
+            self._statistics = (n_live, average_lengths)
+        return self._statistics
+
+    def add(self, df: pd.DataFrame, keys: Optional[np.ndarray] = None) -> np.ndarray:
+        """Index new rows incrementally; returns their document ids."""
+        df = df.reset_index(drop=True)
+        keys = row_keys(df) if keys is None else keys
+        start = len(self.alive)
+        doc_ids = np.arange(start, start + len(df))
+
+        for field, columns in SEARCH_FIELDS.items():
+            present = [col for col in columns if col in df.columns]
+            index = self.fields[field]
+            new_lengths = [index.add(doc, [df.at[row, col] for col in present])
+                           for row, doc in enumerate(doc_ids)]
+            index.lengths = np.concatenate([index.lengths, np.asarray(new_lengths, dtype=np.float32)])
+        for col in STORED_COLUMNS:
+            self.stored[col].extend(self._stored_values(df, col))
+        self.keys = np.concatenate([self.keys, keys])
+        self.alive = np.concatenate([self.alive, np.ones(len(df), dtype=bool)])
+        self._statistics = None
+        return doc_ids
+
+    def remove(self, doc_ids: Iterable[int]):
+        """Tombstone documents; they stop matching immediately."""
+        self.alive[np.asarray(list(doc_ids), dtype=np.int64)] = False
+        self._statistics = None
+
+    def update(self, doc_id: int, row: pd.Series) -> int:
+        """Replace one document's content; returns the new document id."""
+        self.remove([doc_id])
+        return int(self.add(row.to_frame().T)[0])
+
+    def sync(self, df: pd.DataFrame) -> Tuple[int, int]:
+        """Bring the index in line with a changed roster; returns (added, removed)."""
+        keys = row_keys(df)
+        live = np.flatnonzero(self.alive)
+        stale = live[~np.isin(self.keys[live], keys)]
+        fresh = ~np.isin(keys, self.keys[live])
+        self.remove(stale)
+        if fresh.any():
+            self.add(df[fresh], keys[fresh])
+        return int(fresh.sum()), len(stale)
+
+    def compact(self) -> 'SearchIndex':
+        """Rebuild the main segment from live documents, dropping tombstones and the delta."""
+        rows = np.flatnonzero(self.alive)
+        live = pd.DataFrame({col: column.take(rows) for col, column in self.stored.items()})
+        rebuilt = SearchIndex.build(live.replace('', np.nan), self.fingerprint)
+        rebuilt.keys = self.keys[self.alive]
+        return rebuilt
+
+    def _parse(self, query: str, prefix: bool) -> List[Tuple[List[str], str, bool]]:
+        """Split a query into (fields, token, is_prefix) clauses."""
+        clauses = []
+        for part in query.split():
+            field, _, text = part.rpartition(':')
+            fields = [field.lower()] if field.lower() in self.fields else list(self.fields)
+            if field and field.lower() not in self.fields:
+                text = part
+            is_prefix = text.endswith('*')
+            for token in tokenize(text):
+                clauses.append((fields, token, is_prefix))
+        if prefix and clauses:
+            fields, token, _ = clauses[-1]
+            clauses[-1] = (fields, token, True)
+        return clauses
+
+    def search(self, query: str, limit: Optional[int] = 10, match: str = 'all',
+               prefix: bool = False, fields: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """BM25-ranked matches for a query.
+
+        Terms may be restricted to a field group with name:, position: or
+        org:, and a trailing * makes a term a prefix query. With match='all'
+        every term must match somewhere; 'any' ranks partial matches too.
+        prefix=True treats the last term as a prefix (search-as-you-type).
+        """
+        clauses = self._parse(query, prefix)
+        n_docs = len(self.alive)
+        scores = np.zeros(n_docs)
+        matched = np.zeros(n_docs, dtype=np.int32)
+        n_live, average_lengths = self._corpus_statistics()
+        n_live = max(n_live, 1)
+
+        clause_docs = []
+        for clause_fields, token, is_prefix in clauses:
+            hits = []
+            for field in clause_fields:
+                if fields is not None and field not in fields:
+                    continue
+                index = self.fields[field]
+                for term in index.expand(token, is_prefix):
+                    docs, freqs = index.postings(term)
+                    idf = np.log1p((n_live - len(docs) + 0.5) / (len(docs) + 0.5))
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * index.lengths[docs] / average_lengths[field])
+                    # A term's postings hold each document once, so plain fancy-index add is safe
+                    scores[docs] += idf * freqs * (BM25_K1 + 1) / (freqs + norm)
+                    hits.append(docs)
+            # Count each clause once per document, however many fields or terms it hit
+            docs = hits[0] if len(hits) == 1 else np.unique(np.concatenate(hits)) if hits else np.zeros(0, np.int32)
+            matched[docs] += 1
+            clause_docs.append(docs)
+
+        # Candidates come from the postings, never from a scan over every document
+        if not clauses:
+            candidates = np.zeros(0, np.int64)
+        elif match == 'all':
+            candidates = min(clause_docs, key=len)
+            candidates = candidates[matched[candidates] == len(clauses)]
+        else:
+            candidates = np.unique(np.concatenate(clause_docs))
+        candidates = candidates[self.alive[candidates]]
+
+        # Partial selection of the top scores, then a full sort of just those
+        candidate_scores = scores[candidates]
+        if limit is not None and len(candidates) > limit:
+            threshold = np.partition(candidate_scores, len(candidates) - limit)[len(candidates) - limit]
+            keep = candidate_scores >= threshold
+            candidates, candidate_scores = candidates[keep], candidate_scores[keep]
+        order = candidates[np.lexsort((candidates, -candidate_scores))][:limit]
+
+        results = pd.DataFrame({col: self.stored[col].take(order) for col in STORED_COLUMNS})
+        results.insert(0, 'doc_id', order)
+        results['score'] = scores[order]
+        return results
+
+    def save(self, filepath: str):
+        """Write the compacted index and stored columns as an .npz archive.
+
+        The archive is left uncompressed so that loading is a straight read.
+        """
+        index = self.compact() if len(self.alive) != len(self) or any(f.delta for f in self.fields.values()) \
+            else self
+        arrays = {'keys': index.keys}
+        for field, field_index in index.fields.items():
+            arrays[f"{field}_terms"], arrays[f"{field}_term_offsets"] = _pack_strings(field_index.terms)
+            arrays[f"{field}_offsets"] = field_index.offsets
+            arrays[f"{field}_docs"] = field_index.docs
+            arrays[f"{field}_freqs"] = field_index.freqs
+            arrays[f"{field}_lengths"] = field_index.lengths
+        for i, col in enumerate(STORED_COLUMNS):
+            arrays[f"stored_{i}"], arrays[f"stored_{i}_offsets"] = index.stored[col].packed()
+
+        meta = {'version': SEARCH_VERSION, 'fingerprint': index.fingerprint,
+                'fields': list(index.fields), 'stored': STORED_COLUMNS}
+        with open(filepath, 'wb') as f:
+            np.savez(f, __meta__=np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8),
+                     **arrays)
+
+    @classmethod
+    def load(cls, filepath: str) -> 'SearchIndex':
+        """Read an index written by save()."""
+        with np.load(filepath) as archive:
+            meta = json.loads(archive['__meta__'].tobytes().decode('utf-8'))
+            if meta['version'] != SEARCH_VERSION:
+                raise ValueError(f"Unsupported search index version: {meta['version']}")
+            fields = {}
+            for field in meta['fields']:
+                fields[field] = _FieldIndex(
+                    _unpack_strings(archive[f"{field}_terms"], archive[f"{field}_term_offsets"]),
+                    archive[f"{field}_offsets"], archive[f"{field}_docs"], archive[f"{field}_freqs"],
+                    archive[f"{field}_lengths"])
+            stored = {col: _StoredColumn(archive[f"stored_{i}"].tobytes(), archive[f"stored_{i}_offsets"])
+                      for i, col in enumerate(meta['stored'])}
+            keys = archive['keys']
+        return cls(fields, stored, keys, np.ones(len(keys), dtype=bool), meta['fingerprint'])
+
+def load_or_build_search_index(roster_filepath: str, df: Optional[pd.DataFrame] = None) -> SearchIndex:
+    """Load the search index cached next to the roster, syncing it if the roster changed."""
+    index_path = roster_cache_path(roster_filepath, 'search.npz')
+    fingerprint = roster_fingerprint(roster_filepath)
+
+    index = None
+    if os.path.exists(index_path):
+        try:
+            index = SearchIndex.load(index_path)
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+            pass  # Older format or a damaged file: rebuilt from scratch and overwritten below
+    if index is not None and index.fingerprint == fingerprint:
+        return index
+
+    if df is None:
+        from sparklab_analysis import load_and_clean_data
+        df = load_and_clean_data(roster_filepath)
+
+    if index is None:
+        index = SearchIndex.build(df, fingerprint)
+    else:
+        index.sync(df)
+        index.fingerprint = fingerprint
+    index.save(index_path)
+    return index
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+SparkLab Metrics Snapshot Store
+===============================
+
+An append-only history of every run's metrics, so trends such as this quarter's
+CEO/Founder rate against last year's can be charted without re-running old code
+on old rosters. Each run is flattened to {metric key: number} and written as a
+delta against the previous snapshot, with a full keyframe every
+KEYFRAME_INTERVAL snapshots. Snapshots are indexed by timestamp and input hash;
+trend queries are answered from a columnar matrix built once per open.
+
+Appends hold an exclusive lock on the log and first replay any records other
+writers added since this store was opened, so concurrent runs get distinct ids
+and every delta is taken against the true previous snapshot. A torn line left
+by an interrupted writer is cut off before the next record is written, and a
+line that still fails to parse is skipped rather than failing the whole log.
+"""
+
+import contextlib
+import json
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: appends are not serialized
+    fcntl = None
+
+KEYFRAME_INTERVAL = 32
+LOG_FILENAME = 'snapshots.jsonl'
+RECORD_FIELDS = {'id', 'timestamp', 'input_hash', 'keyframe', 'set', 'unset'}
+
+def flatten_metrics(metrics: Dict, timeline: Optional[Dict] = None) -> Dict[str, float]:
+    """Flatten calculate_impact_metrics (and timeline aggregates) to scalar keys."""
+    total = metrics['total_alumni']
+    flat = {'total_alumni': float(total)}
+
+    sector = metrics['sector_distribution']
+    for name, count in sector['distribution'].items():
+        flat[f"sector.{name}.count"] = float(count)
+    for name, pct in sector['percentages'].items():
+        flat[f"sector.{name}.pct"] = float(pct)
+
+    leadership = metrics['leadership_positions']
+    for key in ['ceo_founders', 'ctos', 'faculty', 'senior_leadership']:
+        flat[f"leadership.{key}.count"] = float(leadership[key])
+        flat[f"leadership.{key}.rate"] = float(leadership[key] / total * 100) if total else 0.0
+    for role, count in leadership['all_roles'].items():
+        flat[f"roles.{role}"] = float(count)
+
+    for org, count in metrics['notable_affiliations'].most_common():
+        flat[f"affiliations.{org}"] = float(count)
+    for alumni_type, count in metrics['alumni_types'].items():
+        flat[f"types.{alumni_type}"] = float(count)
+
+    if timeline is not None:
+        for (year, alumni_type), count in timeline['year_type'].stack().items():
+            flat[f"timeline.year_type.{int(year)}.{alumni_type}"] = float(count)
+        for (year, name), pct in timeline['year_sector_pct'].stack().items():
+            flat[f"timeline.year_sector_pct.{int(year)}.{name}"] = float(pct)
+        for year, rate in timeline['leadership_by_year']['Leadership_Rate'].items():
+            flat[f"timeline.leadership_rate.{int(year)}"] = float(rate)
+        if timeline['leadership_trend'] is not None:
+            flat['timeline.leadership_trend.slope'] = float(timeline['leadership_trend'][0])
+
+    return flat
+
+def _utc_timestamp(value) -> pd.Timestamp:
+    """Parse a timestamp, treating naive values as UTC."""
+    stamp = pd.Timestamp(value)
+    return stamp.tz_localize('UTC') if stamp.tzinfo is None else stamp.tz_convert('UTC')
+
+class SnapshotStore:
+    """Append-only, delta-encoded metrics history in a directory."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.log_path = os.path.join(directory, LOG_FILENAME)
+        os.makedirs(directory, exist_ok=True)
+
+        self._records: List[Dict] = []
+        self._states: List[Dict[str, float]] = []
+        self._offset = 0  # Bytes of the log replayed so far
+        self._matrix = None
+        if os.path.exists(self.log_path):
+            with self._locked('rb', shared=True) as f:
+                self._replay(f)
+
+    @contextlib.contextmanager
+    def _locked(self, mode: str, shared: bool = False):
+        """Open the log under a shared or exclusive lock."""
+        with open(self.log_path, mode) as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield f
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _replay(self, f):
+        """Replay complete log records past the current offset into full states."""
+        f.seek(self._offset)
+        state: Dict[str, float] = self._states[-1] if self._states else {}
+        for line in f:
+            if not line.endswith(b'\n'):
+                break  # Torn final line from an interrupted writer
+            self._offset += len(line)
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            if not isinstance(record, dict) or not RECORD_FIELDS <= record.keys():
+                continue  # Damaged line, e.g. a record once written after a torn one
+            if record['keyframe']:
+                state = dict(record['set'])
+            else:
+                state = dict(state)
+                state.update(record['set'])
+                for key in record['unset']:
+                    state.pop(key, None)
+            self._records.append({k: record[k] for k in ('id', 'timestamp', 'input_hash')})
+            self._states.append(state)
+            self._matrix = None
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def append(self, metrics: Dict, timeline: Optional[Dict] = None,
+               input_hash: Optional[str] = None, timestamp: Optional[str] = None) -> int:
+        """Record one run; returns the new snapshot id."""
+        flat = flatten_metrics(metrics, timeline)
+        timestamp = _utc_timestamp(timestamp or datetime.now(timezone.utc)).isoformat(timespec='seconds')
+
+        with self._locked('a+b') as f:
+            # Pick up snapshots appended by other writers since we last read, then
+            # drop any torn tail so the new record starts on a line of its own
+            self._replay(f)
+            f.truncate(self._offset)
+            snapshot_id = len(self._records)
+
+            keyframe = snapshot_id % KEYFRAME_INTERVAL == 0
+            if keyframe:
+                changed, removed = flat, []
+            else:
+                previous = self._states[-1]
+                changed = {key: value for key, value in flat.items() if previous.get(key) != value}
+                removed = [key for key in previous if key not in flat]
+
+            record = {'id': snapshot_id, 'timestamp': timestamp, 'input_hash': input_hash,
+                      'keyframe': keyframe, 'set': changed, 'unset': removed}
+            line = (json.dumps(record, separators=(',', ':')) + '\n').encode('utf-8')
+            f.seek(0, os.SEEK_END)
+            f.write(line)
+            f.flush()
+            self._offset = f.tell()
+
+        self._records.append({'id': snapshot_id, 'timestamp': timestamp, 'input_hash': input_hash})
+        self._states.append(flat)
+        self._matrix = None
+        return snapshot_id
+
+    def snapshots(self) -> pd.DataFrame:
+        """Index of snapshots: id, timestamp and input hash."""
+        frame = pd.DataFrame(self._records, columns=['id', 'timestamp', 'input_hash'])
+        frame['timestamp'] = pd.to_datetime(frame['timestamp'], utc=True)
+        return frame
+
+    def get(self, snapshot_id: int) -> Dict[str, float]:
+        """Full flattened metrics of one snapshot."""
+        return dict(self._states[snapshot_id])
+
+    def find(self, input_hash: str) -> List[int]:
+        """Ids of snapshots taken from the given input."""
+        return [record['id'] for record in self._records if record['input_hash'] == input_hash]
+
+    def _columnar(self):
+        """Snapshots x keys matrix (NaN where absent), built lazily."""
+        if self._matrix is None:
+            keys = sorted({key for state in self._states for key in state})
+            positions = {key: i for i, key in enumerate(keys)}
+            values = np.full((len(self._states), len(keys)), np.nan)
+            for row, state in enumerate(self._states):
+                values[row, [positions[key] for key in state]] = list(state.values())
+            self._matrix = (keys, positions, values)
+        return self._matrix
+
+    def keys(self, prefix: str = '') -> List[str]:
+        """Metric keys seen in any snapshot, optionally filtered by prefix."""
+        return [key for key in self._columnar()[0] if key.startswith(prefix)]
+
+    def trend(self, keys: List[str], since=None, until=None) -> pd.DataFrame:
+        """Metric values over time, one column per key."""
+        _, positions, values = self._columnar()
+        index = pd.to_datetime([record['timestamp'] for record in self._records], utc=True)
+        columns = [values[:, positions[key]] if key in positions else np.full(len(index), np.nan)
+                   for key in keys]
+        frame = pd.DataFrame(dict(zip(keys, columns)), index=index)
+        frame.index.name = 'timestamp'
+        if since is not None:
+            frame = frame[frame.index >= _utc_timestamp(since)]
+        if until is not None:
+            frame = frame[frame.index <= _utc_timestamp(until)]
+        return frame
+
+    def plot_trend(self, keys: List[str], filepath: str = 'sparklab_metric_trends.png'):
+        """Chart metric trends across snapshots."""
+        import matplotlib.pyplot as plt
+
+        frame = self.trend(keys)
+        fig, ax = plt.subplots(figsize=(12, 6))
+        for key in keys:
+            ax.plot(frame.index, frame[key], marker='o', linewidth=2, label=key)
+        ax.set_title('SparkLab Metric Trends', fontweight='bold', pad=20)
+        ax.set_xlabel('Snapshot Date')
+        ax.grid(alpha=0.3, linestyle='--')
+        ax.legend()
+        fig.autofmt_xdate()
+        plt.savefig(filepath, dpi=150, bbox_inches='tight', facecolor='white', edgecolor='none')
+        plt.close(fig)
@@ -7,25 +7,38 @@ This script analyzes UC Berkeley SparkLab alumni data to demonstrate the societa
 of this federally funded research program compared to typical academic outcomes.
 """
 
+import argparse
+import os
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from collections import Counter
 import re
-from typing import Dict, List, Tuple
+import hashlib
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
 import warnings
 warnings.filterwarnings('ignore')
 
+from chart_data import build_chart_series, export_chart_data
+from classification_cache import ClassificationCache
+from classification_rules import default_matcher
+from affiliation_sketch import SpaceSaving
+from enhanced_analysis import prepare_timeline_data, compute_timeline_aggregates
+from snapshot_store import SnapshotStore
+
 # Set up plotting style
 plt.style.use('seaborn-v0_8')
 sns.set_palette("husl")
 
 def load_and_clean_data(filepath: str) -> pd.DataFrame:
     """Load and clean the alumni data."""
-    df = pd.read_csv(filepath)
+    return clean_data(pd.read_csv(filepath))
 
-    # Clean column names
+def clean_data(df: pd.DataFrame) -> pd.DataFrame:
+    """Clean a raw roster frame (or one chunk of it), leaving the input untouched."""
+    # Clean column names on a shallow copy: the raw frame may be shared with other stages
+    df = df.copy(deep=False)
     df.columns = [col.strip() for col in df.columns]
 
     # Remove rows with all NaN values
@@ -38,58 +51,98 @@ def load_and_clean_data(filepath: str) -> pd.DataFrame:
 
     return df
 
-def categorize_positions(df: pd.DataFrame) -> pd.DataFrame:
-    """Categorize positions into leadership roles."""
-    df = df.copy()
+def roster_fingerprint(filepath: str) -> str:
+    """Return a SHA-256 digest of the roster file contents."""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def roster_cache_path(filepath: str, suffix: str) -> str:
+    """Path for a derived artifact stored next to the roster file."""
+    return f"{filepath}.{suffix}"
+
+# Leadership roles come from classification_rules.json, compiled once per process
+RULE_MATCHER = default_matcher()
+
+# Roles in the order classify_position reports them
+LEADERSHIP_ROLES = list(RULE_MATCHER.roles)
+
+# Role bitmasks carry one bit per role; sized from the rule file
+ROLE_MASK_DTYPE = RULE_MATCHER.mask_dtype
+
+# Changes whenever the rule file does, so stale cache entries are never reused
+RULES_VERSION = RULE_MATCHER.version
 
-    # Define leadership keywords
-    ceo_keywords = ['CEO', 'Chief Executive', 'Co-founder', 'Founder']
-    cto_keywords = ['CTO', 'Chief Technology', 'Chief Technical']
-    senior_leadership = ['Chief', 'Director', 'VP', 'Vice President', 'Head of', 'Lead']
-    faculty_keywords = ['Professor', 'Assistant Professor', 'Associate Professor', 'Full Professor']
+def classify_position(position1, position2=None) -> List[str]:
+    """Classify a pair of positions into leadership roles."""
+    return RULE_MATCHER.classify(position1, position2)
 
-    def classify_position(position1, position2=None):
-        positions = [str(position1)]
-        if position2 and str(position2) != 'nan':
-            positions.append(str(position2))
+def make_classification_cache(path: Optional[str] = None, maxsize: int = 65536) -> ClassificationCache:
+    """Create a classification memo, persisted to path if given."""
+    return ClassificationCache(classify_position, RULES_VERSION, path=path, maxsize=maxsize)
+
+# Path of a SQLite store that persists classifications between runs
+CLASSIFICATION_CACHE_ENV = 'SPARKLAB_CLASSIFICATION_CACHE'
+
+default_classification_cache = make_classification_cache(os.environ.get(CLASSIFICATION_CACHE_ENV) or None)
+
+def use_persistent_classification_cache(path: str):
+    """Persist the default classification cache to path, here and in worker processes started later."""
+    os.environ[CLASSIFICATION_CACHE_ENV] = path
+    default_classification_cache.attach(path)
+
+def classify_position_pairs(df: pd.DataFrame,
+                            cache: Optional[ClassificationCache] = None) -> Tuple[np.ndarray, List[List[str]]]:
+    """Classify each distinct (Position 1, Position 2) pair once.
+
+    Returns a code per row and the roles of each distinct pair, so callers
+    broadcast results back with roles[codes].
+    """
+    cache = cache if cache is not None else default_classification_cache
 
-        combined_text = ' '.join(positions).upper()
+    position2 = df['Position 2 or Past Position'] if 'Position 2 or Past Position' in df.columns \
+        else pd.Series(None, index=df.index)
 
-        classifications = []
+    pair_keys = df['Position 1'].astype(str) + '\x1f' + position2.astype(str)
+    codes, uniques = pd.factorize(pair_keys)
+    _, first_rows = np.unique(codes, return_index=True)
+    return codes, cache.classify_many(zip(df['Position 1'].values[first_rows], position2.values[first_rows]))
 
-        # Check for leadership roles
-        if any(keyword.upper() in combined_text for keyword in ceo_keywords):
-            classifications.append('CEO/Founder')
-        if any(keyword.upper() in combined_text for keyword in cto_keywords):
-            classifications.append('CTO')
-        if any(keyword.upper() in combined_text for keyword in faculty_keywords):
-            classifications.append('Faculty')
-        if any(keyword.upper() in combined_text for keyword in senior_leadership):
-            classifications.append('Senior Leadership')
+def categorize_positions(df: pd.DataFrame, cache: Optional[ClassificationCache] = None) -> pd.DataFrame:
+    """Categorize positions into leadership roles."""
+    # Shallow copy: the new column is added without duplicating the roster
+    df = df.copy(deep=False)
 
-        return classifications if classifications else ['Other']
+    # Each distinct title pair is classified once, then broadcast back to rows
+    codes, roles = classify_position_pairs(df, cache)
 
-    df['Leadership_Roles'] = df.apply(lambda row: classify_position(
-        row['Position 1'], row.get('Position 2 or Past Position', None)), axis=1)
+    roles_array = np.empty(len(roles), dtype=object)
+    roles_array[:] = roles
+    df['Leadership_Roles'] = roles_array[codes] if len(codes) else []
 
     return df
 
+# Clean up the sector categorization
+INDUSTRY_MAPPING = {
+    'industry': 'Industry',
+    'academia': 'Academia',
+    'academia/industry': 'Both',
+    'Industry': 'Industry',
+    'Academia': 'Academia',
+    'Unknown': 'Unknown'
+}
+
+def map_sectors(df: pd.DataFrame) -> pd.Series:
+    """Cleaned sector per alumnus, without adding a column to df."""
+    if 'Sector' in df.columns:
+        return df['Sector']
+    return df['Industry or Academia?'].map(INDUSTRY_MAPPING).fillna('Unknown').rename('Sector')
+
 def analyze_industry_vs_academia(df: pd.DataFrame) -> Dict:
     """Analyze the distribution between industry and academia."""
-    industry_dist = df['Industry or Academia?'].value_counts()
-
-    # Clean up the categorization
-    industry_mapping = {
-        'industry': 'Industry',
-        'academia': 'Academia',
-        'academia/industry': 'Both',
-        'Industry': 'Industry',
-        'Academia': 'Academia',
-        'Unknown': 'Unknown'
-    }
-
-    df['Sector'] = df['Industry or Academia?'].map(industry_mapping).fillna('Unknown')
-    sector_dist = df['Sector'].value_counts()
+    sector_dist = map_sectors(df).value_counts()
 
     return {
         'distribution': sector_dist,
@@ -119,37 +172,57 @@ def count_leadership_positions(df: pd.DataFrame) -> Dict:
         'senior_leadership': senior_leadership_count
     }
 
-def identify_notable_companies(df: pd.DataFrame) -> List[str]:
-    """Identify notable companies and universities."""
-    companies = df['Company/University 1'].tolist()
+# Notable tech companies
+NOTABLE_COMPANIES = [
+    'Google', 'Microsoft', 'Amazon', 'Apple', 'Meta', 'Facebook', 'Databricks',
+    'OpenAI', 'Anthropic', 'Nvidia', 'Uber', 'Airbnb', 'Splunk', 'Oracle',
+    'Salesforce', 'Tesla', 'Netflix', 'Adobe', 'Intel', 'Qualcomm'
+]
+
+# Top universities
+TOP_UNIVERSITIES = [
+    'MIT', 'Stanford', 'Harvard', 'UC Berkeley', 'Carnegie Mellon', 'Princeton',
+    'Yale', 'Columbia', 'Cornell', 'University of Washington', 'University of Michigan',
+    'Georgia Tech', 'University of Texas', 'University of Wisconsin'
+]
+
+NOTABLE_ORGANIZATIONS = NOTABLE_COMPANIES + TOP_UNIVERSITIES
+
+def match_notable_organization(company) -> Optional[str]:
+    """Return the first notable organization named in company, if any."""
+    if isinstance(company, str):
+        for notable in NOTABLE_ORGANIZATIONS:
+            if notable.lower() in company.lower():
+                return notable
+    return None
+
+def _notable_matches(df: pd.DataFrame) -> Iterator[str]:
+    """Yield the notable organization of each current, then past, affiliation that names one."""
+    columns = [df['Company/University 1']]
     if 'Company/University 2' in df.columns:
-        companies.extend(df['Company/University 2'].dropna().tolist())
-
-    # Notable tech companies
-    notable_companies = [
-        'Google', 'Microsoft', 'Amazon', 'Apple', 'Meta', 'Facebook', 'Databricks',
-        'OpenAI', 'Anthropic', 'Nvidia', 'Uber', 'Airbnb', 'Splunk', 'Oracle',
-        'Salesforce', 'Tesla', 'Netflix', 'Adobe', 'Intel', 'Qualcomm'
-    ]
-
-    # Top universities
-    top_universities = [
-        'MIT', 'Stanford', 'Harvard', 'UC Berkeley', 'Carnegie Mellon', 'Princeton',
-        'Yale', 'Columbia', 'Cornell', 'University of Washington', 'University of Michigan',
-        'Georgia Tech', 'University of Texas', 'University of Wisconsin'
-    ]
-
-    company_matches = []
-    for company in companies:
-        if isinstance(company, str):
-            for notable in notable_companies + top_universities:
-                if notable.lower() in company.lower():
-                    company_matches.append(notable)
-                    break
+        columns.append(df['Company/University 2'].dropna())
+    for column in columns:
+        for company in column:
+            notable = match_notable_organization(company)
+            if notable is not None:
+                yield notable
+
+def identify_notable_companies(df: pd.DataFrame,
+                               sketch_capacity: Optional[int] = None) -> Union[Counter, SpaceSaving]:
+    """Identify notable companies and universities.
+
+    Returns an exact Counter, or a fixed-memory SpaceSaving sketch of the
+    given capacity when sketch_capacity is set. Matches are streamed into
+    either one, so no per-row list is built.
+    """
+    if sketch_capacity is not None:
+        sketch = SpaceSaving(sketch_capacity)
+        sketch.update_many(_notable_matches(df))
+        return sketch
 
-    return Counter(company_matches)
+    return Counter(_notable_matches(df))
 
-def calculate_impact_metrics(df: pd.DataFrame) -> Dict:
+def calculate_impact_metrics(df: pd.DataFrame, sketch_capacity: Optional[int] = None) -> Dict:
     """Calculate key impact metrics."""
     total_alumni = len(df)
 
@@ -160,7 +233,7 @@ def calculate_impact_metrics(df: pd.DataFrame) -> Dict:
     leadership_analysis = count_leadership_positions(df)
 
     # Notable affiliations
-    notable_affiliations = identify_notable_companies(df)
+    notable_affiliations = identify_notable_companies(df, sketch_capacity=sketch_capacity)
 
     # Alumni type distribution
     type_dist = df['Type'].value_counts()
@@ -305,7 +378,7 @@ def create_visualizations(df: pd.DataFrame, metrics: Dict):
 
     # 6. Career Paths by Type (Enhanced Stacked Bar)
     ax6 = fig.add_subplot(gs[1, 2:])
-    sector_by_type = pd.crosstab(df['Type'], df['Sector'])
+    sector_by_type = pd.crosstab(df['Type'], map_sectors(df))
     sector_by_type_pct = sector_by_type.div(sector_by_type.sum(axis=1), axis=0) * 100
 
     bars = sector_by_type_pct.plot(kind='bar', stacked=True, ax=ax6,
@@ -478,12 +551,26 @@ gaps and drive technological innovation with significant societal impact.
 
     return report
 
-def main():
+def main(argv: Optional[Sequence[str]] = None):
     """Main analysis function."""
+    parser = argparse.ArgumentParser(description='Analyze the SparkLab alumni roster.')
+    parser.add_argument('--classification-cache', default=None,
+                        help=f'SQLite file that keeps classifications between runs '
+                             f'(or set {CLASSIFICATION_CACHE_ENV})')
+    args = parser.parse_args(argv)
+    if args.classification_cache:
+        use_persistent_classification_cache(args.classification_cache)
+
     print("Loading and analyzing SparkLab alumni data...")
 
-    # Load data
-    df = load_and_clean_data('SparkLabAlumni.csv')
+    # Load and validate data
+    from data_validation import validate_roster
+    raw_df = pd.read_csv('SparkLabAlumni.csv')
+    validation_errors = validate_roster(raw_df, 'SparkLabAlumni.csv')
+    validation_errors.to_csv('sparklab_validation_errors.csv', index=False)
+    print(f"Validation: {(validation_errors['severity'] == 'error').sum()} errors, "
+          f"{(validation_errors['severity'] == 'warning').sum()} warnings")
+    df = clean_data(raw_df)
 
     # Categorize positions
     df = categorize_positions(df)
@@ -494,6 +581,9 @@ def main():
     # Create visualizations
     create_visualizations(df, metrics)
 
+    # Export chart series for client-side rendering
+    export_chart_data(build_chart_series(df, metrics), 'sparklab_chart_data.json')
+
     # Generate report
     report = generate_detailed_report(df, metrics)
 
@@ -501,10 +591,18 @@ def main():
     with open('sparklab_impact_report.txt', 'w') as f:
         f.write(report)
 
+    # Record this run in the metrics history
+    timeline = compute_timeline_aggregates(prepare_timeline_data(df))
+    SnapshotStore('sparklab_snapshots').append(metrics, timeline,
+                                               input_hash=roster_fingerprint('SparkLabAlumni.csv'))
+
     print("\nAnalysis complete!")
     print("Generated files:")
     print("- sparklab_impact_analysis.png (visualizations)")
+    print("- sparklab_chart_data.json (chart series for client-side rendering)")
     print("- sparklab_impact_report.txt (detailed report)")
+    print("- sparklab_snapshots/ (metrics history)")
+    print("- sparklab_validation_errors.csv (data-quality findings)")
 
     # Print key findings
     print("\n" + "="*50)